@@ -1,34 +1,14 @@
 from shiny import App, ui, reactive, render
-import numpy as np
-import pandas as pd
-from pandas.api.types import is_numeric_dtype, is_string_dtype
-from pydataset import data
 import janitor
-from functools import reduce
+from catalog import Catalog
+from filter_engine import FilterIndex, FilterState
 
-dfs = data()['dataset_id'].to_list()
+# cleaned datasets with their column statistics and sorted values, loaded in
+# the background and kept for all sessions within the catalog's memory budget
+catalog = Catalog(clean=lambda df: FilterIndex(df.clean_names(case_type='snake')),
+                  sizeof=lambda index: index.nbytes)
 
-def make_ui(x, var):
-    if is_numeric_dtype(x):
-        rng = (x.min(), x.max())
-        res = ui.input_slider(var, var, min=rng[0], max=rng[1], value=rng)
-    elif is_string_dtype(x):
-        levs = list(np.unique(x))
-        res = ui.input_select(var, var, choices=levs, selected=levs, multiple=True)
-    else:
-        res = None
-
-    return res
-
-def filter_var(x, val):
-    if is_numeric_dtype(x):
-        res = (~np.isnan(x)) & (x >= val[0]) & (x <= val[1])
-    elif is_string_dtype(x):
-        res = np.isin(x, val)
-    else:
-        res = True
-    
-    return res
+dfs = catalog.names()
 
 app_ui = ui.page_fluid(
     ui.layout_sidebar(
@@ -42,26 +22,29 @@ app_ui = ui.page_fluid(
 
 def server(input, output, session):
     @reactive.calc
-    def cleaned_data():
-        return data(input._dataset()).clean_names(case_type='snake')
+    async def index():
+        return await catalog.aget(input._dataset())
 
     @reactive.calc
-    def _vars():
-        return cleaned_data().columns
+    async def cleaned_data():
+        return (await index()).df
     
     @render.ui
-    def _filter():
-        return list(map(lambda x: make_ui(cleaned_data()[x], x), _vars())),
+    async def _filter():
+        return (await index()).make_ui()
+
+    # last value and mask of every column, so that only changed columns are refiltered
+    @reactive.calc
+    async def filters():
+        return FilterState(await index())
 
     @reactive.calc
-    def selected():
-        each_var = map(lambda x: filter_var(cleaned_data()[x], input[x]()), _vars())
-        res = reduce(lambda x, y: x & y, each_var)
-        
-        return res
+    async def selected():
+        state = await filters()
+        return state.update({x: input[x]() for x in state.index.columns})
     
     @render.table
-    def _data():
-        return cleaned_data()[selected()].head(12)
+    async def _data():
+        return (await cleaned_data())[await selected()].head(12)
 
 app = App(app_ui, server)
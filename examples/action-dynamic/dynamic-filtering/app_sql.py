@@ -0,0 +1,40 @@
+from shiny import App, ui, reactive, render
+from pydataset import data
+import janitor
+from functools import lru_cache
+from sql_filter import to_sqlite, SqlFilter
+
+dfs = data()['dataset_id'].to_list()
+
+# a dataset is copied into a local SQLite file the first time it is picked;
+# its column statistics are then queried once for all sessions
+@lru_cache(maxsize=16)
+def sql_table(dataset):
+    engine = to_sqlite(data(dataset).clean_names(case_type='snake'), "pydataset.sqlite", dataset)
+    return SqlFilter(engine, dataset)
+
+app_ui = ui.page_fluid(
+    ui.layout_sidebar(
+        ui.sidebar(
+            ui.input_select("_dataset", label="Dataset", choices=dfs),
+            ui.output_ui("_filter"),
+        ),
+        ui.output_table("_data"),
+    )
+)
+
+def server(input, output, session):
+    @reactive.calc
+    def table():
+        return sql_table(input._dataset())
+
+    @render.ui
+    def _filter():
+        return table().make_ui()
+
+    # the filters become a WHERE clause, and only the 12 rows shown are read
+    @render.table
+    def _data():
+        return table().page({x: input[x]() for x in table().columns}, limit=12)
+
+app = App(app_ui, server)
@@ -0,0 +1,113 @@
+"""Dynamic filters that reuse per-column work between input changes.
+
+`FilterIndex` is built once per dataset and shared by every session. For
+each column it keeps the statistics `make_ui()` needs (range or levels) and a
+structure that makes filtering cheap: numeric columns are sorted once, so a
+range filter is two binary searches, and string columns are factorized, so a
+level filter is a lookup on integer codes.
+
+`FilterState` is per session. It remembers each column's last input value
+and mask, recomputes only the columns whose value changed, and folds the
+column masks into one boolean array that is updated in place.
+
+    index = FilterIndex(df)
+    state = FilterState(index)
+    mask = state.update({var: input[var]() for var in index.columns})
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_string_dtype
+from shiny import ui
+
+
+class NumericColumn:
+    def __init__(self, x):
+        values = x.to_numpy(dtype=float)
+        # NaNs sort to the end and are never inside a range
+        self.order = np.argsort(values, kind='stable')
+        self.sorted = values[self.order]
+        self.n_valid = int(np.count_nonzero(~np.isnan(values)))
+        self.range = (x.min(), x.max()) if self.n_valid else (0, 0)
+
+    def make_ui(self, var):
+        return ui.input_slider(var, var, min=self.range[0], max=self.range[1], value=self.range)
+
+    def mask(self, val, out):
+        valid = self.sorted[:self.n_valid]
+        lo = np.searchsorted(valid, val[0], side='left')
+        hi = np.searchsorted(valid, val[1], side='right')
+        out[:] = False
+        out[self.order[lo:hi]] = True
+        return out
+
+
+class StringColumn:
+    def __init__(self, x):
+        codes, levels = pd.factorize(x, sort=True)
+        # missing values get code -1, which looks up the trailing False
+        self.codes = codes
+        self.levels = list(levels)
+
+    def make_ui(self, var):
+        return ui.input_select(var, var, choices=self.levels, selected=self.levels, multiple=True)
+
+    def mask(self, val, out):
+        lookup = np.zeros(len(self.levels) + 1, dtype=bool)
+        lookup[:-1] = np.isin(self.levels, val)
+        return np.take(lookup, self.codes, out=out)
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.df = df
+        self.columns = {}
+        for var in df.columns:
+            x = df[var]
+            if is_numeric_dtype(x):
+                self.columns[var] = NumericColumn(x)
+            elif is_string_dtype(x):
+                self.columns[var] = StringColumn(x)
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def nbytes(self):
+        """Memory held by the data frame and the per-column arrays."""
+        total = int(self.df.memory_usage(index=True, deep=True).sum())
+        for column in self.columns.values():
+            total += sum(a.nbytes for a in vars(column).values() if isinstance(a, np.ndarray))
+        return total
+
+    def make_ui(self):
+        """One filter input per column that can be filtered."""
+        return [column.make_ui(var) for var, column in self.columns.items()]
+
+
+class FilterState:
+    def __init__(self, index):
+        self.index = index
+        self.values = {}
+        self.masks = {var: np.ones(len(index), dtype=bool) for var in index.columns}
+        self.mask = np.ones(len(index), dtype=bool)
+
+    def update(self, values):
+        """Apply the input `values` of each column; return the combined mask.
+
+        Only columns whose value differs from the previous call are
+        recomputed. The returned array is reused by later calls.
+        """
+        changed = False
+        for var, val in values.items():
+            column = self.index.columns.get(var)
+            if column is None or self.values.get(var) == val:
+                continue
+            column.mask(val, out=self.masks[var])
+            self.values[var] = val
+            changed = True
+
+        if changed:
+            self.mask[:] = True
+            for mask in self.masks.values():
+                self.mask &= mask
+        return self.mask
@@ -0,0 +1,129 @@
+"""Dynamic filters pushed down to a SQL database.
+
+The pandas apps filter every row of an in-memory frame and then keep the
+first 12. `SqlFilter` instead turns the filter inputs into a `WHERE` clause
+and asks the database for one page with `LIMIT`, so only the rows shown are
+read into Python and the table does not need to fit in memory.
+
+Column statistics for `make_ui()` (ranges and levels) are computed by the
+database once per table. `to_sqlite()` loads a data frame into a local
+SQLite file with an index on every column, which lets both the statistics
+and the filters use index lookups instead of full scans.
+
+    engine = to_sqlite(df, "data.sqlite", "iris")
+    table = SqlFilter(engine, "iris")
+    page = table.page({var: input[var]() for var in table.columns})
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+from shiny import ui
+
+
+def to_sqlite(df, path, table, chunksize=10_000):
+    """Write `df` to `table` in the SQLite file at `path` unless it is already there."""
+    engine = sa.create_engine(f"sqlite:///{path}")
+    if not sa.inspect(engine).has_table(table):
+        # write under a temporary name and rename, so a half-written table is never seen
+        tmp_table = f"{table}_tmp_{os.getpid()}"
+        df.to_sql(tmp_table, engine, index=False, if_exists='replace', chunksize=chunksize)
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE "{tmp_table}" RENAME TO "{table}"')
+                for i, col in enumerate(df.columns):
+                    conn.exec_driver_sql(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{i}" ON "{table}" ("{col}")')
+        except sa.exc.OperationalError:
+            # another worker created the table first: drop ours and use theirs
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{tmp_table}"')
+            if not sa.inspect(engine).has_table(table):
+                raise
+    return engine
+
+
+def _kind(column):
+    if isinstance(column.type, sa.Boolean):
+        return 'bool'
+    if isinstance(column.type, (sa.DateTime, sa.Date)):
+        return 'date'
+    if isinstance(column.type, (sa.Integer, sa.Float, sa.Numeric)):
+        return 'numeric'
+    if isinstance(column.type, sa.String):
+        return 'string'
+    return None
+
+
+class SqlFilter:
+    def __init__(self, engine, table):
+        self.engine = engine
+        self.table = sa.Table(table, sa.MetaData(), autoload_with=engine)
+        self.columns = {c.name: _kind(c) for c in self.table.columns if _kind(c)}
+        # keep the table's row order, as `.head()` does
+        self.order_by = list(self.table.primary_key.columns)
+        if not self.order_by and engine.dialect.name == 'sqlite':
+            self.order_by = [sa.literal_column('rowid')]
+        self.stats = {}
+        with engine.connect() as conn:
+            for var, kind in self.columns.items():
+                col = self.table.c[var]
+                if kind in ('string', 'bool'):
+                    query = sa.select(col).where(col.isnot(None)).distinct().order_by(col)
+                    self.stats[var] = conn.execute(query).scalars().all()
+                else:
+                    self.stats[var] = tuple(conn.execute(sa.select(sa.func.min(col), sa.func.max(col))).one())
+
+    def make_ui(self):
+        """One filter input per column that can be filtered."""
+        res = []
+        for var, kind in self.columns.items():
+            stats = self.stats[var]
+            if kind == 'numeric':
+                res.append(ui.input_slider(var, var, min=stats[0], max=stats[1], value=stats))
+            elif kind == 'string':
+                res.append(ui.input_select(var, var, choices=stats, selected=stats, multiple=True))
+            elif kind == 'bool':
+                levels = [str(x) for x in stats]
+                res.append(ui.input_select(var, var, choices=levels, selected=levels, multiple=True))
+            else:
+                rng = tuple(pd.Timestamp(x).date() for x in stats)
+                res.append(ui.input_date_range(var, var, min=rng[0], max=rng[1], start=rng[0], end=rng[1]))
+        return res
+
+    def where(self, values):
+        """The `WHERE` clause for the input `values` of each column.
+
+        Like `filter_var()`, missing values never pass a range filter.
+        """
+        clauses = []
+        for var, val in values.items():
+            kind = self.columns.get(var)
+            col = self.table.c[var] if kind else None
+            if kind == 'numeric':
+                # plain Python numbers, as the database driver cannot bind NumPy scalars
+                lo, hi = np.asarray(val).tolist()
+                clauses.append(col.between(lo, hi))
+            elif kind == 'string':
+                clauses.append(col.in_(list(val)))
+            elif kind == 'bool':
+                # the select input sends the levels back as 'True' and 'False'
+                clauses.append(col.in_([v in (True, 'True') for v in val]))
+            elif kind == 'date':
+                clauses.append(col.between(datetime.combine(val[0], datetime.min.time()),
+                                           datetime.combine(val[1], datetime.max.time())))
+        return sa.and_(sa.true(), *clauses)
+
+    def page(self, values, limit=12, offset=0):
+        """Up to `limit` matching rows, starting at row `offset`."""
+        query = (sa.select(self.table).where(self.where(values))
+                 .order_by(*self.order_by).limit(limit).offset(offset))
+        with self.engine.connect() as conn:
+            return pd.read_sql(query, conn)
+
+    def count(self, values):
+        """Number of rows that match `values`."""
+        query = sa.select(sa.func.count()).select_from(self.table).where(self.where(values))
+        with self.engine.connect() as conn:
+            return conn.execute(query).scalar_one()
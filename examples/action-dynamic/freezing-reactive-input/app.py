@@ -1,5 +1,6 @@
 from shiny import App, ui, reactive, render, req
 from pydataset import data
+from shared_cache import shared_cache
 
 app_ui = ui.page_fluid(
     ui.input_select("dataset", "Choose a dataset", choices=("pressure", "cars")),
@@ -9,6 +10,7 @@ app_ui = ui.page_fluid(
 
 def server(input, output, session):
     @reactive.calc
+    @shared_cache(input.dataset)
     def dataset():
         return data(input.dataset())
     
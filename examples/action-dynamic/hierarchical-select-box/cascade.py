@@ -0,0 +1,104 @@
+"""Cascading select inputs backed by a nested index of a data frame.
+
+`CascadeIndex` groups a data frame by a list of columns once, e.g.
+territory -> customer -> order, and stores the row positions of every group
+in nested dicts. The choices of each level and the rows of a selection are
+then dictionary lookups rather than filters over the whole table.
+
+`cascade_ui()` and `cascade_server()` are a module with one select input per
+level; picking a value updates the choices of the next level down.
+
+    sales_index = CascadeIndex(sales, ['TERRITORY', 'CUSTOMERNAME', 'ORDERNUMBER'])
+    ...
+    rows = cascade_server("order", sales_index)
+"""
+import numpy as np
+from shiny import module, reactive, req, ui
+
+
+class CascadeIndex:
+    def __init__(self, df, levels):
+        self.df = df
+        self.levels = list(levels)
+        # keys are strings, as select inputs return them; dicts keep the order
+        # in which values first appear, as `Series.unique()` does
+        self.tree = {}
+        groups = df.groupby(self.levels, sort=False, dropna=False, observed=True).indices
+        for key, rows in groups.items():
+            if not isinstance(key, tuple):
+                key = (key,)
+            node = self.tree
+            for value in key[:-1]:
+                node = node.setdefault(str(value), {})
+            node[str(key[-1])] = rows
+
+    def _node(self, path):
+        node = self.tree
+        for value in path:
+            node = node.get(str(value)) if isinstance(node, dict) else None
+            if node is None:
+                return None
+        return node
+
+    def choices(self, *path):
+        """Values of the level below `path`, e.g. the customers of a territory."""
+        node = self._node(path)
+        return list(node) if isinstance(node, dict) else []
+
+    def rows(self, *path):
+        """Row positions of everything under `path`, in table order."""
+        node = self._node(path)
+        if node is None:
+            return np.array([], dtype=np.intp)
+        leaves = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            else:
+                leaves.append(node)
+        return leaves[0] if len(leaves) == 1 else np.sort(np.concatenate(leaves))
+
+    def subset(self, *path, columns=None):
+        """The rows under `path`, optionally only `columns`."""
+        df = self.df if columns is None else self.df[columns]
+        return df.iloc[self.rows(*path)]
+
+
+@module.ui
+def cascade_ui(index, labels):
+    """One select input per level of `index`, labelled by `labels`."""
+    ids = [level.lower() for level in index.levels]
+    return ui.TagList(
+        ui.input_select(ids[0], labels[0], choices=index.choices()),
+        *[ui.input_select(id, label, choices=list()) for id, label in zip(ids[1:], labels[1:])],
+    )
+
+
+@module.server
+def cascade_server(input, output, session, index):
+    """Keep each level's choices in step with the levels above it.
+
+    Returns a reactive calc of the row positions of the selected leaf.
+    """
+    ids = [level.lower() for level in index.levels]
+
+    def selected(depth):
+        return [input[id]() for id in ids[:depth]]
+
+    def update(depth):
+        @reactive.effect
+        def _():
+            ui.update_select(ids[depth], choices=index.choices(*selected(depth)))
+
+    for depth in range(1, len(ids)):
+        update(depth)
+
+    @reactive.calc
+    def rows():
+        path = selected(len(ids))
+        req(*path)
+        return index.rows(*path)
+
+    return rows
@@ -0,0 +1,71 @@
+"""Typed loader for `sales_data_sample.csv`.
+
+Only the columns the app asks for are parsed. Repeated strings (territory,
+product code, customer) are stored as categoricals, numbers get the
+narrowest dtype that holds them, and `ORDERDATE` is parsed to datetimes once.
+The typed frame is pickled next to the CSV, so later starts and other worker
+processes load the binary snapshot instead of parsing the file again. The
+snapshot is rebuilt whenever the CSV or the column list changes.
+"""
+import os
+import pickle
+
+import pandas as pd
+
+VERSION = 1
+
+DTYPES = {
+    'ORDERNUMBER': 'int32',
+    'QUANTITYORDERED': 'int32',
+    'PRICEEACH': 'float64',
+    'PRODUCTCODE': 'category',
+    'CUSTOMERNAME': 'category',
+    'TERRITORY': 'category',
+}
+
+DATES = {'ORDERDATE': '%m/%d/%Y %H:%M'}
+
+
+def file_signature(path):
+    """Size and modification time of `path`, used to detect a changed file."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _read(path, columns):
+    sales = pd.read_csv(path, sep=",", encoding="Latin-1",
+                        usecols=columns,
+                        dtype={col: DTYPES[col] for col in columns if col in DTYPES},
+                        # 'NA' is the North America territory, not a missing value
+                        na_values=["", "NaN"], keep_default_na=False)
+    for col, format in DATES.items():
+        if col in columns:
+            sales[col] = pd.to_datetime(sales[col], format=format)
+    return sales[columns]
+
+
+def load_sales(columns, path="sales-dashboard/sales_data_sample.csv", snapshot=None):
+    """The sales table restricted to `columns`, in that order.
+
+    `snapshot` is where the typed frame is pickled; it defaults to the CSV
+    path with a `.pkl` suffix.
+    """
+    columns = list(columns)
+    if snapshot is None:
+        snapshot = os.path.splitext(path)[0] + ".pkl"
+    key = {'version': VERSION, 'source': file_signature(path), 'columns': columns}
+
+    try:
+        with open(snapshot, "rb") as f:
+            saved = pickle.load(f)
+        if saved['key'] == key:
+            return saved['sales']
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+        pass
+
+    sales = _read(path, columns)
+    tmp_path = f"{snapshot}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({'key': key, 'sales': sales}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot)
+    return sales
@@ -0,0 +1,39 @@
+from shiny import App, ui, render, reactive
+from time import sleep
+import random
+
+from extended_task import extended_task
+
+app_ui = ui.page_fluid(
+    ui.input_numeric("steps", "How many steps?", 10),
+    ui.input_action_button("go", "go"),
+    ui.output_text("result"),
+)
+
+def server(input, output, session):
+    # runs on a worker thread, so other sessions are not blocked by sleep()
+    @extended_task()
+    def compute(progress, steps):
+        progress.set(message="Computing random number")
+        for i in range(1, steps):
+            progress.inc(1/steps)
+            sleep(0.5)
+
+        return random.uniform(0, 1)
+
+    @reactive.effect
+    @reactive.event(input.go)
+    def _():
+        compute.invoke(input.steps())
+
+    # a result for the old number of steps is no longer wanted
+    @reactive.effect
+    @reactive.event(input.steps)
+    def _():
+        compute.cancel()
+
+    @render.text
+    def result():
+        return round(compute.result(), 2)
+
+app = App(app_ui, server)
@@ -0,0 +1,268 @@
+"""Run slow work in the background without holding up the app.
+
+Every session of an app shares one event loop and one reactive graph. A calc
+that calls `time.sleep()` blocks the loop, and even an `async` calc that
+awaits keeps its reactive flush, and the lock around it, until it returns:
+inputs from every other session wait until then.
+
+`ExtendedTask` runs the work on a thread pool (or on a process pool passed
+as `executor`) outside of any flush. `invoke()` starts it and returns at
+once. When the work finishes, the result is set under the reactive lock and
+the outputs that read `result()` update. Until then they keep showing the
+previous result, and the rest of the app stays responsive.
+
+The work is a plain function that gets a `progress` object as its first
+argument. Its `set()` and `inc()` take the same arguments as those of
+`ui.Progress`, are safe to call from the worker, and are shown to the
+session as a progress bar (or with `NotificationProgress`, as a
+notification):
+
+    @extended_task()
+    def compute(progress, steps):
+        for i in range(steps):
+            progress.inc(1 / steps)
+            time.sleep(0.5)
+        return random.uniform(0, 1)
+
+    @reactive.effect
+    @reactive.event(input.go)
+    def _():
+        compute.invoke(input.steps())
+
+    @render.text
+    def result():
+        return round(compute.result(), 2)
+
+Only the latest run counts. `invoke()` while a run is in progress, or
+`cancel()`, cancels the run before it: its result is never delivered, and
+its next `progress.set()`, `progress.inc()` or `progress.check()` raises
+`Cancelled`, so the worker stops instead of finishing work nobody will see.
+Long loops that report no progress can call `progress.check()` themselves.
+Runs of a session that ends are cancelled too.
+
+Progress from worker threads is handed to the event loop with
+`call_soon_threadsafe()`, so no thread waits for it. With a
+`ProcessPoolExecutor` the function must be defined at module level, so it
+can be pickled, and progress and cancellation go through `multiprocessing`
+manager objects; one thread of the loop's default executor then waits for
+progress while the run lasts. With `progress=None` no progress is sent at
+all.
+"""
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from shiny import reactive, req, ui
+from shiny.session import get_current_session
+
+WORKERS = 4
+
+_executor = None
+_manager = None
+
+
+def _default_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="extended-task")
+    return _executor
+
+
+class _LoopChannel:
+    """Progress updates put by worker threads, queued on the event loop."""
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue()
+
+    def put(self, update):
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, update)
+
+    async def get(self):
+        return await self._queue.get()
+
+
+def _shared(executor, loop, progress):
+    # a channel the worker can put progress updates on (None without
+    # progress), and a cancellation flag it can check, that also work across
+    # processes for a process pool
+    global _manager
+    if isinstance(executor, ProcessPoolExecutor):
+        if _manager is None:
+            _manager = multiprocessing.Manager()
+        return (_manager.Queue() if progress else None), _manager.Event()
+    return (_LoopChannel(loop) if progress else None), threading.Event()
+
+
+class Cancelled(Exception):
+    """Raised inside the work function once its run has been cancelled."""
+
+
+class _Reporter:
+    """The `progress` argument of the work function; only queues updates."""
+
+    def __init__(self, channel, cancel):
+        self._channel = channel
+        self._cancel = cancel
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        """Raise `Cancelled` if this run has been cancelled."""
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def _put(self, update):
+        self.check()
+        # without progress there is no channel: updates are dropped, and
+        # cancellation still works
+        if self._channel is not None:
+            self._channel.put(update)
+
+    def set(self, value=None, message=None, detail=None):
+        self._put(("set", value, message, detail))
+
+    def inc(self, amount=0.1, message=None, detail=None):
+        self._put(("inc", amount, message, detail))
+
+
+def _work(fn, progress, args, kwargs):
+    # a queued run may have been cancelled before a worker picked it up
+    progress.check()
+    return fn(progress, *args, **kwargs)
+
+
+class NotificationProgress:
+    """Progress shown as one notification, with the interface of `ui.Progress`."""
+
+    def __init__(self, min=0, max=1, session=None):
+        self._session = session
+        self._id = None
+
+    def set(self, value=None, message=None, detail=None):
+        text = " ".join(part for part in (message, detail) if part)
+        if text:
+            self._id = ui.notification_show(
+                text, id=self._id, duration=None, close_button=False, session=self._session
+            )
+
+    def inc(self, amount=0.1, message=None, detail=None):
+        self.set(message=message, detail=detail)
+
+    def close(self):
+        if self._id is not None:
+            ui.notification_remove(self._id, session=self._session)
+            self._id = None
+
+
+class ExtendedTask:
+    def __init__(self, fn, executor=None, progress=ui.Progress):
+        self.fn = fn
+        self.executor = executor
+        self.progress = progress
+        self._session = get_current_session()
+        self._status = reactive.Value("initial")
+        self._result = reactive.Value(None)
+        self._task = None
+        self._run_id = 0
+        self._cancel = None
+        if self._session is not None:
+            self._session.on_ended(self._stop)
+
+    def invoke(self, *args, **kwargs):
+        """Start `fn(progress, *args, **kwargs)` in the background and return at once.
+
+        A run still in progress is cancelled.
+        """
+        self._stop()
+        self._status.set("running")
+        executor = self.executor or _default_executor()
+        loop = asyncio.get_running_loop()
+        channel, self._cancel = _shared(executor, loop, self.progress)
+        run = self._run(self._run_id, executor, channel, self._cancel, args, kwargs)
+        # an empty context, so the task is not tied to the reactive context
+        # of the effect that invoked it
+        self._task = contextvars.Context().run(asyncio.create_task, run)
+
+    def cancel(self):
+        """Cancel the run in progress, if any; `result()` keeps the last result."""
+        if self._cancel is not None and not self._cancel.is_set():
+            self._stop()
+            self._status.set("cancelled")
+
+    def _stop(self):
+        # no later result may be delivered, and the worker should give up
+        self._run_id += 1
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def status(self):
+        """'initial', 'running', 'success', 'error' or 'cancelled'."""
+        return self._status()
+
+    def result(self):
+        """The result of the last finished run.
+
+        Raises the error of the last run if it failed; stops silently, like
+        `req()`, if no run has finished yet.
+        """
+        result = self._result()
+        req(result is not None)
+        value, error = result
+        if error is not None:
+            raise error
+        return value
+
+    async def _pump(self, channel, display):
+        loop = asyncio.get_running_loop()
+        while True:
+            if isinstance(channel, _LoopChannel):
+                update = await channel.get()
+            else:
+                # a multiprocessing queue can only be waited on by a thread
+                update = await loop.run_in_executor(None, channel.get)
+            if update is None:
+                return
+            method, *args = update
+            getattr(display, method)(*args)
+
+    async def _run(self, run_id, executor, channel, cancel, args, kwargs):
+        loop = asyncio.get_running_loop()
+        pump = display = None
+        if channel is not None:
+            display = self.progress(session=self._session)
+            pump = asyncio.create_task(self._pump(channel, display))
+        try:
+            value = await loop.run_in_executor(
+                executor, _work, self.fn, _Reporter(channel, cancel), args, kwargs
+            )
+            error = None
+        except Exception as e:
+            value, error = None, e
+        finally:
+            if pump is not None:
+                # the worker is done, so every update it made is ahead of this one
+                channel.put(None)
+                await pump
+                display.close()
+
+        if run_id != self._run_id:
+            # superseded or cancelled: a newer run, if any, delivers instead
+            return
+        self._cancel = None
+        async with reactive.lock():
+            self._result.set((value, error))
+            self._status.set("error" if error is not None else "success")
+            await reactive.flush()
+
+
+def extended_task(executor=None, progress=ui.Progress):
+    """Turn `fn(progress, ...)` into an `ExtendedTask`; use it inside the server function.
+
+    `progress=None` shows no progress.
+    """
+    return lambda fn: ExtendedTask(fn, executor=executor, progress=progress)
@@ -1,9 +1,10 @@
 from shiny import App, ui, render, reactive, req
 from shiny_validate import InputValidator, check
-from pydataset import data
+from catalog import Catalog
 import numpy as np
 
-datasets = set(data()['dataset_id'])
+catalog = Catalog()
+datasets = set(catalog.names())
 
 app_ui = ui.page_fluid(
     ui.input_text("dataset", "Dataset name"),
@@ -21,13 +22,13 @@ def server(input, output, session):
     iv.enable()
 
     @reactive.calc
-    def load():
+    async def load():
         req(input.dataset())
         req(iv.is_valid(), cancel_output=True)
-        return data(input.dataset())
+        return await catalog.aget(input.dataset())
     
     @render.table
-    def table():
-        return load().head()
+    async def table():
+        return (await load()).head()
 
 app = App(app_ui, server)
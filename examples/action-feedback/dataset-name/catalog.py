@@ -0,0 +1,168 @@
+"""Lazy, memory-bounded catalog of pydataset datasets.
+
+`data()` re-reads a dataset's CSV every time it is called, and `data()`
+without arguments re-reads the list of datasets. `Catalog` reads the list
+once, on first use, and keeps the parsed (and optionally cleaned) datasets
+in an LRU cache that stays under a memory budget.
+
+Datasets are loaded on a background thread. `aget()` awaits that thread,
+so a session waiting for a large dataset does not block the event loop for
+other sessions. After each load, the datasets next to it in the list are
+prefetched, since a select input is usually stepped through in order.
+Prefetches run on a thread of their own, and those that have not started
+yet are cancelled when a session asks for a dataset, so a requested dataset
+never waits behind a speculative load.
+
+    catalog = Catalog(clean=lambda df: df.clean_names(case_type='snake'))
+    ui.input_select("dataset", "Dataset", choices=catalog.names())
+    ...
+    df = await catalog.aget(input.dataset())
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from pydataset import data
+
+BUDGET_BYTES = 256 * 1024 * 1024
+
+
+def frame_bytes(df):
+    """Memory held by a data frame, including the strings in object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class Catalog:
+    def __init__(self, clean=None, sizeof=frame_bytes, budget=BUDGET_BYTES, prefetch=1):
+        self.clean = clean
+        self.sizeof = sizeof
+        self.budget = budget
+        self.prefetch = prefetch
+        self._names = None
+        self._titles = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._loading = {}
+        self._prefetches = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="catalog")
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-prefetch")
+
+    def _load_list(self):
+        if self._names is None:
+            desc = data()
+            self._titles = dict(zip(desc['dataset_id'], desc['title']))
+            self._names = list(self._titles)
+        return self._names
+
+    def names(self):
+        """IDs of all datasets, read on first use."""
+        return list(self._load_list())
+
+    def title(self, name):
+        self._load_list()
+        return self._titles.get(name)
+
+    def __contains__(self, name):
+        self._load_list()
+        return name in self._titles
+
+    def _read(self, name):
+        df = data(name)
+        if isinstance(df, pd.DataFrame) and self.clean is not None:
+            df = self.clean(df)
+        return df
+
+    def _forget(self, name, future):
+        # a cancelled prefetch may already have been replaced by a real load
+        if self._loading.get(name) is future:
+            del self._loading[name]
+        if self._prefetches.get(name) is future:
+            del self._prefetches[name]
+
+    def _store(self, name, future):
+        if future.cancelled() or future.exception() is not None:
+            with self._lock:
+                self._forget(name, future)
+            return
+        value = future.result()
+        size = self.sizeof(value) if value is not None else 0
+        with self._lock:
+            self._forget(name, future)
+            if name in self._entries:
+                self._bytes -= self._entries.pop(name)[0]
+            if size > self.budget:
+                return
+            self._entries[name] = (size, value)
+            self._bytes += size
+            while self._bytes > self.budget:
+                _, (old_size, _) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+
+    def _cancel_prefetches(self):
+        with self._lock:
+            pending = list(self._prefetches.values())
+        # outside the lock: cancel() runs the `_store` callback at once; only
+        # prefetches that have not started can be cancelled
+        for future in pending:
+            future.cancel()
+
+    def _submit(self, name, prefetch=False):
+        """The future loading `name`; at most one load per dataset runs at a time."""
+        if not prefetch:
+            self._cancel_prefetches()
+        with self._lock:
+            future = self._loading.get(name)
+            if future is not None:
+                return future
+            executor = self._prefetcher if prefetch else self._executor
+            future = executor.submit(self._read, name)
+            self._loading[name] = future
+            if prefetch:
+                self._prefetches[name] = future
+        # outside the lock: the callback runs at once if the load already finished
+        future.add_done_callback(lambda f: self._store(name, f))
+        return future
+
+    def _cached(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                return True, entry[1]
+            return False, None
+
+    def _prefetch_around(self, name):
+        names = self._load_list()
+        if name not in self._titles or not self.prefetch:
+            return
+        i = names.index(name)
+        for neighbor in names[i + 1:i + 1 + self.prefetch] + names[max(i - self.prefetch, 0):i]:
+            if not self._cached(neighbor)[0]:
+                self._submit(neighbor, prefetch=True)
+
+    def get(self, name):
+        """The (cleaned) dataset `name`, or None if there is no such dataset."""
+        if name not in self:
+            return None
+        found, value = self._cached(name)
+        if not found:
+            value = self._submit(name).result()
+        self._prefetch_around(name)
+        return value
+
+    async def aget(self, name):
+        """Like `get()`, but awaits the load instead of blocking the event loop."""
+        if name not in self:
+            return None
+        found, value = self._cached(name)
+        if not found:
+            value = await asyncio.wrap_future(self._submit(name))
+        self._prefetch_around(name)
+        return value
+
+    def info(self):
+        with self._lock:
+            return {'datasets': len(self._entries), 'bytes': self._bytes, 'budget': self.budget}
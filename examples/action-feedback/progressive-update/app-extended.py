@@ -0,0 +1,41 @@
+from shiny import Inputs, Outputs, Session, App, reactive, render, req, ui
+from pydataset import data
+from time import sleep
+
+from extended_task import extended_task, NotificationProgress
+
+mtcars = data('mtcars')
+
+app_ui = ui.page_fluid(
+    ui.output_table("table"),
+)
+
+
+def server(input: Inputs, output: Outputs, session: Session):
+    # runs on a worker thread, so other sessions are not blocked by sleep()
+    @extended_task(progress=NotificationProgress)
+    def load(progress):
+        progress.set(message="Reading data...")
+        sleep(1)
+
+        progress.set(message="Reticulating splines...")
+        sleep(1)
+
+        progress.set(message="Herding llamas...")
+        sleep(1)
+
+        progress.set(message="Orthogonalizing matrices...")
+        sleep(1)
+
+        return mtcars
+
+    @reactive.effect
+    def _():
+        load.invoke()
+
+    @render.table
+    def table():
+        return load.result().head()
+
+
+app = App(app_ui, server)
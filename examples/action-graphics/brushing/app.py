@@ -1,16 +1,14 @@
 from shiny import App, render, ui, req
 from matplotlib import pyplot as plt
 from pydataset import data
+from coords import brush_mask
 
 mtcars = data("mtcars")
 
 # brushed_points(mtcars, {'xmin': 2, 'xmax': 3, 'ymin': 20, 'ymax': 30}, 'wt', 'mpg')
 def brushed_points(df, position, xvar, yvar):
-    in_region = ((df[xvar] > position['xmin']) 
-                 & (df[xvar] < position['xmax'])
-                 & (df[yvar] > position['ymin'])
-                 & (df[yvar] < position['ymax']))
-    
+    in_region = brush_mask(df[xvar].to_numpy(), df[yvar].to_numpy(), position)
+
     return df[in_region]
 
 
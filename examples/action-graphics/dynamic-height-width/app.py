@@ -2,6 +2,8 @@ from shiny import App, ui, render, reactive
 import matplotlib.pyplot as plt
 from numpy.random import normal
 
+from rate_limit import throttle
+
 app_ui = ui.page_fluid(
     ui.input_slider("height", "height", min=100, max=500, value=250),
     ui.input_slider("width", "width", min=100, max=500, value=250),
@@ -9,6 +11,10 @@ app_ui = ui.page_fluid(
 )
 
 def server(input, output, session):
+    # dragging a slider rebuilds the plot a few times a second, not on every step
+    height = throttle(250)(input.height)
+    width = throttle(250)(input.width)
+
     @render.plot
     def plot():
         return plt.scatter(normal(size=20), normal(size=20))
@@ -16,7 +22,7 @@ def server(input, output, session):
     @render.ui
     def plot_container():
         return ui.output_plot("plot", 
-                              height=f"{input.height()}px", 
-                              width=f"{input.width()}px")
+                              height=f"{height()}px", 
+                              width=f"{width()}px")
 
 app = App(app_ui, server)
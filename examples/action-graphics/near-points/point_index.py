@@ -0,0 +1,67 @@
+"""Spatial index for finding the data points near a plot click.
+
+`PointIndex` is built once per dataset and pair of plotted columns. Queries
+in data units use a KD-tree over the raw values. Queries in pixels use a
+KD-tree over the points mapped to image pixels by `coords.to_pixels()`;
+that tree is built the first time a plot geometry is seen and reused for
+every later click on the same plot.
+"""
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from coords import to_pixels
+
+
+class PointIndex:
+    def __init__(self, df, xvar, yvar, max_geometries=8):
+        self.x = df[xvar].to_numpy(dtype=float)
+        self.y = df[yvar].to_numpy(dtype=float)
+        self.data_tree = cKDTree(np.column_stack([self.x, self.y]))
+        self.max_geometries = max_geometries
+        self._pixel_trees = OrderedDict()
+
+    def __len__(self):
+        return len(self.x)
+
+    def _pixel_tree(self, event):
+        log = event.get('log') or {}
+        key = (
+            tuple(event['domain'][k] for k in ('left', 'right', 'bottom', 'top')),
+            tuple(event['range'][k] for k in ('left', 'right', 'bottom', 'top')),
+            (log.get('x'), log.get('y')),
+        )
+        tree = self._pixel_trees.get(key)
+        if tree is None:
+            pixels = np.empty((len(self), 2))
+            to_pixels(self.x, event, 'x', out=pixels[:, 0])
+            to_pixels(self.y, event, 'y', out=pixels[:, 1])
+            tree = cKDTree(pixels)
+            self._pixel_trees[key] = tree
+            while len(self._pixel_trees) > self.max_geometries:
+                self._pixel_trees.popitem(last=False)
+        else:
+            self._pixel_trees.move_to_end(key)
+        return tree
+
+    def near(self, event, threshold=20, max_points=None):
+        """Row positions within `threshold` pixels of a click, nearest first."""
+        tree = self._pixel_tree(event)
+        click = np.array([event['coords_img']['x'], event['coords_img']['y']])
+        rows = np.array(tree.query_ball_point(click, threshold), dtype=np.intp)
+        dist = np.hypot(*(tree.data[rows] - click).T)
+        return rows[np.argsort(dist, kind='stable')[:max_points]]
+
+    def nearest(self, event, k=1):
+        """Row positions of the `k` points closest to a click in pixels."""
+        tree = self._pixel_tree(event)
+        click = (event['coords_img']['x'], event['coords_img']['y'])
+        _, rows = tree.query(click, k=min(k, len(self)))
+        return np.atleast_1d(rows)
+
+    def within(self, x, y, radius):
+        """Row positions and distances of the points within `radius` of (x, y) in data units."""
+        rows = np.array(self.data_tree.query_ball_point((x, y), radius), dtype=np.intp)
+        dist = np.hypot(self.x[rows] - x, self.y[rows] - y)
+        return rows, dist
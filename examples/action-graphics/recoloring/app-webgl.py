@@ -0,0 +1,54 @@
+from shiny import App, ui, reactive
+from matplotlib import colormaps
+from pydataset import data
+from coords import brush_mask
+from selection import Selection
+from scatter_gl import output_scatter_gl, render_scatter_gl, send_scatter_delta
+import numpy as np
+
+mtcars = data("mtcars")
+
+# colors of unselected and selected points, as 0-255 RGB; as in app.py,
+# selected points take the first color of the colormap
+palette = (colormaps['viridis']([1.0, 0.0])[:, :3] * 255).round().astype(np.uint8)
+
+# brushed_points(mtcars, {'xmin': 2, 'xmax': 3, 'ymin': 20, 'ymax': 30}, 'wt', 'mpg')
+def brushed_points(df, position, xvar, yvar):
+    in_region = brush_mask(df[xvar].to_numpy(), df[yvar].to_numpy(), position)
+
+    return df[in_region], in_region
+
+
+app_ui = ui.page_fluid(
+    output_scatter_gl("plot"),
+)
+
+def server(input, output, session):
+    selection = Selection(mtcars.shape[0])
+
+    async def recolor(rows):
+        if len(rows) > 0:
+            colors = palette[selection.mask[rows].astype(int)]
+            await send_scatter_delta(session, "plot", rows, color=colors)
+
+    @reactive.effect
+    @reactive.event(input.plot_brush)
+    async def _():
+        _, brushed = brushed_points(mtcars, input.plot_brush(), xvar='wt', yvar='mpg')
+        await recolor(selection.union(brushed))
+
+    @reactive.effect
+    @reactive.event(input.plot_dblclick)
+    async def _():
+        await recolor(selection.clear())
+
+    # the points are sent once; brushing only pushes the colors that changed
+    @render_scatter_gl
+    def plot():
+        return {
+            'x': mtcars['wt'],
+            'y': mtcars['mpg'],
+            'color': palette[selection.mask.astype(int)],
+        }
+
+app = App(app_ui, server)
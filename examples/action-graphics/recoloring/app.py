@@ -1,17 +1,22 @@
 from shiny import App, render, ui, reactive
-from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib import colormaps
 from pydataset import data
-import pandas as pd
+from coords import brush_mask
+from selection import Selection
+import numpy as np
 
 mtcars = data("mtcars")
 
+# colors of unselected and selected points; as with categories=[True, False],
+# selected points take the first color of the colormap
+palette = colormaps['viridis']([1.0, 0.0])
+
 # brushed_points(mtcars, {'xmin': 2, 'xmax': 3, 'ymin': 20, 'ymax': 30}, 'wt', 'mpg')
 def brushed_points(df, position, xvar, yvar):
-    in_region = ((df[xvar] > position['xmin']) 
-                 & (df[xvar] < position['xmax'])
-                 & (df[yvar] > position['ymin'])
-                 & (df[yvar] < position['ymax']))
-    
+    in_region = brush_mask(df[xvar].to_numpy(), df[yvar].to_numpy(), position)
+
     return df[in_region], in_region
 
 
@@ -20,27 +25,42 @@ app_ui = ui.page_fluid(
 )
 
 def server(input, output, session):
-    selected = reactive.value([False for _ in range(mtcars.shape[0])])
+    selection = Selection(mtcars.shape[0])
+    # rows whose color has to be redrawn, collected until the next render
+    dirty = np.ones(mtcars.shape[0], dtype=bool)
+    redraw = reactive.value(0)
+
+    def mark(rows):
+        if len(rows) > 0:
+            dirty[rows] = True
+            redraw.set(redraw.get() + 1)
 
     @reactive.effect
     @reactive.event(input.plot_brush)
     def _():
         _, brushed = brushed_points(mtcars, input.plot_brush(), xvar='wt', yvar='mpg')
-        selected.set(brushed | selected.get())
-    
+        mark(selection.union(brushed))
+
     @reactive.effect
     @reactive.event(input.plot_dblclick)
     def _():
-        selected.set([False for _ in range(mtcars.shape[0])])
+        mark(selection.clear())
+
+    # the figure is drawn once per session; later renders only recolor points
+    fig = Figure(layout='tight')
+    ax = fig.subplots()
+    colors = np.repeat(palette[:1], mtcars.shape[0], axis=0)
+    points = ax.scatter(mtcars['wt'], mtcars['mpg'], c=colors)
+    handles = [Line2D([], [], marker='o', linestyle='', color=c) for c in palette[::-1]]
+    ax.legend(handles, ['True', 'False'], loc="lower left", title="Classes")
 
     @render.plot
     def plot():
-        color = pd.Categorical(selected(), categories=[True, False])
-        fig, ax = plt.subplots()
-        res = ax.scatter(mtcars['wt'], mtcars['mpg'], c=color, label=color)
-        # produce a legend with the unique colors from the scatter
-        legend1 = ax.legend(*res.legend_elements(), loc="lower left", title="Classes")
-        ax.add_artist(legend1)        
-        return res
+        redraw()
+        rows = np.flatnonzero(dirty)
+        colors[rows] = palette[selection.mask[rows].astype(int)]
+        dirty[rows] = False
+        points.set_facecolor(colors)
+        return fig
 
 app = App(app_ui, server)
@@ -0,0 +1,39 @@
+"""Incremental row selection for brushing, stored as a NumPy boolean array.
+
+`union()`, `intersect()` and `clear()` update the selection in place and
+return the positions of the rows whose state changed, so a plot only needs
+to restyle those points.
+"""
+import numpy as np
+
+
+class Selection:
+    def __init__(self, n):
+        self.mask = np.zeros(n, dtype=bool)
+        self._scratch = np.empty(n, dtype=bool)
+
+    def __len__(self):
+        return len(self.mask)
+
+    def count(self):
+        return int(np.count_nonzero(self.mask))
+
+    def union(self, mask):
+        """Add the rows in `mask`; return the rows that became selected."""
+        changed = np.greater(mask, self.mask, out=self._scratch)
+        rows = np.flatnonzero(changed)
+        self.mask |= mask
+        return rows
+
+    def intersect(self, mask):
+        """Keep only the rows also in `mask`; return the rows that were dropped."""
+        changed = np.greater(self.mask, mask, out=self._scratch)
+        rows = np.flatnonzero(changed)
+        self.mask &= mask
+        return rows
+
+    def clear(self):
+        """Deselect every row; return the rows that were selected."""
+        rows = np.flatnonzero(self.mask)
+        self.mask[rows] = False
+        return rows
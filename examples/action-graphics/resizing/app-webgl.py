@@ -0,0 +1,49 @@
+from shiny import App, ui, reactive
+import pandas as pd
+import numpy as np
+from point_index import PointIndex
+from scatter_gl import output_scatter_gl, render_scatter_gl, send_scatter_delta
+
+np.random.seed(1014)
+df = pd.DataFrame({
+    'x': np.random.normal(size=100),
+    'y': np.random.normal(size=100)
+})
+
+df_index = PointIndex(df, 'x', 'y')
+
+# points farther than this are drawn at the maximum size of 300 anyway
+max_dist = 300 ** (1 / 5)
+
+def compute_distance(index, position, cap=max_dist):
+    dist = np.full(len(index), cap)
+    rows, near = index.within(position['x'], position['y'], cap)
+    dist[rows] = near
+
+    return dist
+
+# matplotlib sizes are areas in points^2, WebGL sizes are diameters in pixels
+def point_size(dist):
+    return np.sqrt(np.minimum(np.power(dist, 5), 300)) * 96 / 72
+
+app_ui = ui.page_fluid(
+    output_scatter_gl("plot"),
+)
+
+def server(input, output, session):
+    size = point_size(np.ones(df.shape[0]))
+
+    @reactive.effect
+    @reactive.event(input.plot_click)
+    async def _():
+        new_size = point_size(compute_distance(df_index, input.plot_click()))
+        rows = np.flatnonzero(new_size != size)
+        size[rows] = new_size[rows]
+        await send_scatter_delta(session, "plot", rows, size=size[rows])
+
+    # the points are sent once; clicks only push the sizes that changed
+    @render_scatter_gl
+    def plot():
+        return {'x': df['x'], 'y': df['y'], 'size': size}
+
+app = App(app_ui, server)
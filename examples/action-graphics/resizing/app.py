@@ -1,7 +1,7 @@
 from shiny import App, ui, render, reactive
 import pandas as pd
 import numpy as np
-from sklearn.metrics import pairwise_distances
+from point_index import PointIndex
 from matplotlib import pyplot as plt
 
 np.random.seed(1014)
@@ -10,12 +10,15 @@ df = pd.DataFrame({
     'y': np.random.normal(size=100)
 })
 
-def compute_distance(df, position, xvar, yvar):
-    points = df[[xvar, yvar]].copy().to_numpy()
-    click = np.array([[position['x'], position['y']]])
+df_index = PointIndex(df, 'x', 'y')
 
-    # Compute distance
-    dist = pairwise_distances(points, click)
+# points farther than this are drawn at the maximum size of 300 anyway
+max_dist = 300 ** (1 / 5)
+
+def compute_distance(index, position, cap=max_dist):
+    dist = np.full(len(index), cap)
+    rows, near = index.within(position['x'], position['y'], cap)
+    dist[rows] = near
 
     return dist
 
@@ -29,7 +32,7 @@ def server(input, output, session):
     @reactive.effect
     @reactive.event(input.plot_click)
     def _():
-        dist.set(compute_distance(df, input.plot_click(), xvar='x', yvar='y'))
+        dist.set(compute_distance(df_index, input.plot_click()))
     
     @render.plot
     def plot():
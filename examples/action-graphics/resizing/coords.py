@@ -0,0 +1,77 @@
+"""Mapping between data values and image pixels for plot events.
+
+Click, double-click, hover and brush inputs carry the plot's coordmap:
+`domain` and `range` of the panel, plus a `log` base per axis when that axis
+is on a log scale (the domain is then in log units). These helpers apply the
+same formula as Shiny's JavaScript to whole NumPy arrays, writing into `out`
+when given so that repeated events do not allocate new arrays.
+"""
+import numpy as np
+
+
+def _scale(event, axis):
+    lo, hi = ('left', 'right') if axis == 'x' else ('bottom', 'top')
+    logbase = (event.get('log') or {}).get(axis)
+    return event['domain'][lo], event['domain'][hi], event['range'][lo], event['range'][hi], logbase
+
+
+def to_pixels(values, event, axis, out=None):
+    """Map data `values` on `axis` ('x' or 'y') to image pixels.
+
+    Pass `out=values` (a float array) to transform in place.
+    """
+    domain_min, domain_max, range_min, range_max, logbase = _scale(event, axis)
+    if out is None:
+        out = np.array(values, dtype=float)
+    elif out is not values:
+        np.copyto(out, values)
+    if logbase:
+        np.log(out, out=out)
+        out /= np.log(logbase)
+    out -= domain_min
+    out *= (range_max - range_min) / (domain_max - domain_min)
+    out += range_min
+    return out
+
+
+def from_pixels(values, event, axis, out=None):
+    """Map image pixels on `axis` back to data values; the inverse of `to_pixels()`."""
+    domain_min, domain_max, range_min, range_max, logbase = _scale(event, axis)
+    if out is None:
+        out = np.array(values, dtype=float)
+    elif out is not values:
+        np.copyto(out, values)
+    out -= range_min
+    out *= (domain_max - domain_min) / (range_max - range_min)
+    out += domain_min
+    if logbase:
+        np.power(logbase, out, out=out)
+    return out
+
+
+def brush_mask(x, y, brush, out=None):
+    """Boolean mask of the points strictly inside a brush.
+
+    The brush bounds are in data units, so no pixel mapping is needed. All
+    four comparisons are folded into `out` with one scratch array.
+    """
+    if out is None:
+        out = np.empty(len(x), dtype=bool)
+    scratch = np.empty_like(out)
+    np.greater(x, brush['xmin'], out=out)
+    out &= np.less(x, brush['xmax'], out=scratch)
+    out &= np.greater(y, brush['ymin'], out=scratch)
+    out &= np.less(y, brush['ymax'], out=scratch)
+    return out
+
+
+def near_mask(x, y, event, threshold=5, out=None):
+    """Boolean mask of the points within `threshold` pixels of a click or hover."""
+    px = to_pixels(x, event, 'x')
+    py = to_pixels(y, event, 'y')
+    px -= event['coords_img']['x']
+    py -= event['coords_img']['y']
+    np.multiply(px, px, out=px)
+    np.multiply(py, py, out=py)
+    px += py
+    return np.less_equal(px, threshold ** 2, out=out)
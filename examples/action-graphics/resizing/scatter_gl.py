@@ -0,0 +1,293 @@
+"""Scatter plot drawn in the browser with WebGL.
+
+`output_scatter_gl()` and `@render_scatter_gl` replace `ui.output_plot()` and
+`@render.plot` for plain scatter plots. The render function returns a dict
+with `x` and `y` and optionally per-point `size` (diameter in pixels) and
+`color` (RGB, 0-255):
+
+    @render_scatter_gl
+    def plot():
+        return {'x': df['x'], 'y': df['y'], 'size': 6}
+
+The coordinates are sent once as base64-encoded typed arrays. Afterwards
+`send_scatter_delta()` pushes new sizes or colors for just the rows that
+changed, and the browser redraws without a round-trip through matplotlib.
+
+Like `ui.output_plot()`, the output sends `<id>_click`, `<id>_dblclick` and
+`<id>_brush` inputs, with `x`/`y` and `xmin`/`xmax`/`ymin`/`ymax` in data
+units. No axes are drawn.
+"""
+import base64
+
+import numpy as np
+from htmltools import HTMLDependency
+from shiny import ui
+from shiny.render.transformer import output_transformer, resolve_value_fn
+
+_JS = r"""
+(function() {
+  if (window.scatterGlBinding) return;
+
+  function decode(b64, Type) {
+    var bin = atob(b64), bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  var VERT = [
+    'attribute vec2 a_pos;',
+    'attribute float a_size;',
+    'attribute vec3 a_color;',
+    'uniform vec4 u_domain;',
+    'uniform float u_dpr;',
+    'varying vec3 v_color;',
+    'void main() {',
+    '  vec2 p = (a_pos - u_domain.xz) / (u_domain.yw - u_domain.xz);',
+    '  gl_Position = vec4(p * 2.0 - 1.0, 0.0, 1.0);',
+    '  gl_PointSize = a_size * u_dpr;',
+    '  v_color = a_color;',
+    '}'
+  ].join('\n');
+
+  var FRAG = [
+    'precision mediump float;',
+    'varying vec3 v_color;',
+    'void main() {',
+    '  if (length(gl_PointCoord - 0.5) > 0.5) discard;',
+    '  gl_FragColor = vec4(v_color, 1.0);',
+    '}'
+  ].join('\n');
+
+  function shader(gl, type, src) {
+    var s = gl.createShader(type);
+    gl.shaderSource(s, src);
+    gl.compileShader(s);
+    return s;
+  }
+
+  function upload(s, name, data) {
+    var gl = s.gl;
+    gl.bindBuffer(gl.ARRAY_BUFFER, s.buffers[name]);
+    gl.bufferData(gl.ARRAY_BUFFER, data, gl.DYNAMIC_DRAW);
+  }
+
+  function attribute(s, name, buffer, size, type, normalized) {
+    var gl = s.gl, loc = gl.getAttribLocation(s.prog, name);
+    gl.bindBuffer(gl.ARRAY_BUFFER, s.buffers[buffer]);
+    gl.enableVertexAttribArray(loc);
+    gl.vertexAttribPointer(loc, size, type, normalized, 0, 0);
+  }
+
+  function draw(s) {
+    var gl = s.gl, dpr = window.devicePixelRatio || 1;
+    var w = Math.round(s.canvas.clientWidth * dpr);
+    var h = Math.round(s.canvas.clientHeight * dpr);
+    if (s.canvas.width !== w || s.canvas.height !== h) {
+      s.canvas.width = w;
+      s.canvas.height = h;
+    }
+    gl.viewport(0, 0, w, h);
+    gl.clearColor(1, 1, 1, 1);
+    gl.clear(gl.COLOR_BUFFER_BIT);
+    if (!s.n) return;
+    gl.useProgram(s.prog);
+    gl.uniform4fv(gl.getUniformLocation(s.prog, 'u_domain'), s.domain);
+    gl.uniform1f(gl.getUniformLocation(s.prog, 'u_dpr'), dpr);
+    attribute(s, 'a_pos', 'pos', 2, gl.FLOAT, false);
+    attribute(s, 'a_size', 'size', 1, gl.FLOAT, false);
+    attribute(s, 'a_color', 'color', 3, gl.UNSIGNED_BYTE, true);
+    gl.drawArrays(gl.POINTS, 0, s.n);
+  }
+
+  // canvas pixels (from the top left) to data units
+  function toData(s, px, py) {
+    var d = s.domain, r = s.canvas.getBoundingClientRect();
+    return {
+      x: d[0] + (px / r.width) * (d[1] - d[0]),
+      y: d[3] - (py / r.height) * (d[3] - d[2])
+    };
+  }
+
+  function listen(s) {
+    var start = null, id = s.el.id;
+    function offset(e) {
+      var r = s.canvas.getBoundingClientRect();
+      return [e.clientX - r.left, e.clientY - r.top];
+    }
+    s.canvas.addEventListener('mousedown', function(e) {
+      start = offset(e);
+    });
+    s.canvas.addEventListener('mousemove', function(e) {
+      if (!start) return;
+      var p = offset(e), b = s.box.style;
+      b.display = 'block';
+      b.left = Math.min(start[0], p[0]) + 'px';
+      b.top = Math.min(start[1], p[1]) + 'px';
+      b.width = Math.abs(p[0] - start[0]) + 'px';
+      b.height = Math.abs(p[1] - start[1]) + 'px';
+    });
+    window.addEventListener('mouseup', function(e) {
+      if (!start || !s.domain) return;
+      var p = offset(e), a = toData(s, start[0], start[1]), b = toData(s, p[0], p[1]);
+      if (Math.abs(p[0] - start[0]) < 3 && Math.abs(p[1] - start[1]) < 3) {
+        s.box.style.display = 'none';
+        Shiny.setInputValue(id + '_click', a, {priority: 'event'});
+      } else {
+        Shiny.setInputValue(id + '_brush', {
+          xmin: Math.min(a.x, b.x), xmax: Math.max(a.x, b.x),
+          ymin: Math.min(a.y, b.y), ymax: Math.max(a.y, b.y)
+        }, {priority: 'event'});
+      }
+      start = null;
+    });
+    s.canvas.addEventListener('dblclick', function(e) {
+      if (!s.domain) return;
+      var p = offset(e);
+      s.box.style.display = 'none';
+      Shiny.setInputValue(id + '_dblclick', toData(s, p[0], p[1]), {priority: 'event'});
+    });
+  }
+
+  function setup(el) {
+    var canvas = document.createElement('canvas');
+    canvas.style.width = '100%';
+    canvas.style.height = '100%';
+    canvas.style.display = 'block';
+    var box = document.createElement('div');
+    box.style.cssText = 'position:absolute;display:none;pointer-events:none;' +
+      'border:1px solid #9cf;background:rgba(153,204,255,0.25);';
+    el.style.position = 'relative';
+    el.appendChild(canvas);
+    el.appendChild(box);
+
+    var gl = canvas.getContext('webgl');
+    var prog = gl.createProgram();
+    gl.attachShader(prog, shader(gl, gl.VERTEX_SHADER, VERT));
+    gl.attachShader(prog, shader(gl, gl.FRAGMENT_SHADER, FRAG));
+    gl.linkProgram(prog);
+
+    var s = {
+      el: el, canvas: canvas, box: box, gl: gl, prog: prog, n: 0,
+      buffers: {pos: gl.createBuffer(), size: gl.createBuffer(), color: gl.createBuffer()}
+    };
+    listen(s);
+    return s;
+  }
+
+  var binding = new Shiny.OutputBinding();
+  $.extend(binding, {
+    find: function(scope) {
+      return $(scope).find('.scatter-gl-output');
+    },
+    renderValue: function(el, data) {
+      var s = el._scatterGl || (el._scatterGl = setup(el));
+      s.box.style.display = 'none';
+      if (!data) {
+        s.n = 0;
+        draw(s);
+        return;
+      }
+      s.n = data.n;
+      s.domain = new Float32Array(data.domain);
+      s.pos = decode(data.pos, Float32Array);
+      s.size = decode(data.size, Float32Array);
+      s.color = decode(data.color, Uint8Array);
+      upload(s, 'pos', s.pos);
+      upload(s, 'size', s.size);
+      upload(s, 'color', s.color);
+      draw(s);
+    }
+  });
+  Shiny.outputBindings.register(binding, 'scatter-gl');
+  window.scatterGlBinding = binding;
+
+  Shiny.addCustomMessageHandler('scatter-gl-delta', function(msg) {
+    var el = document.getElementById(msg.id), s = el && el._scatterGl;
+    if (!s || !s.n) return;
+    var rows = decode(msg.rows, Int32Array), i, k;
+    if (msg.size) {
+      var size = decode(msg.size, Float32Array);
+      for (i = 0; i < rows.length; i++) s.size[rows[i]] = size[i];
+      upload(s, 'size', s.size);
+    }
+    if (msg.color) {
+      var color = decode(msg.color, Uint8Array);
+      for (i = 0; i < rows.length; i++) {
+        for (k = 0; k < 3; k++) s.color[3 * rows[i] + k] = color[3 * i + k];
+      }
+      upload(s, 'color', s.color);
+    }
+    draw(s);
+  });
+
+  window.addEventListener('resize', function() {
+    $('.scatter-gl-output').each(function() {
+      if (this._scatterGl) draw(this._scatterGl);
+    });
+  });
+})();
+"""
+
+_dependency = HTMLDependency("scatter-gl", "0.1.0", head=ui.tags.script(_JS))
+
+# matplotlib's default blue
+DEFAULT_COLOR = (31, 119, 180)
+
+
+def _encode(values, dtype):
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
+
+
+def _limits(values, pad=0.04):
+    lo, hi = (float(np.min(values)), float(np.max(values))) if len(values) else (0.0, 1.0)
+    span = (hi - lo) or 1.0
+    return [lo - pad * span, hi + pad * span]
+
+
+def output_scatter_gl(id, width="100%", height="400px"):
+    """Placeholder for a `@render_scatter_gl` output."""
+    return ui.div(
+        _dependency,
+        id=id,
+        class_="scatter-gl-output",
+        style=f"width:{width};height:{height};",
+    )
+
+
+@output_transformer(default_ui=output_scatter_gl)
+async def ScatterGlTransformer(_meta, _fn):
+    value = await resolve_value_fn(_fn)
+    if value is None:
+        return None
+
+    x = np.asarray(value['x'], dtype=float)
+    y = np.asarray(value['y'], dtype=float)
+    n = len(x)
+    size = np.broadcast_to(np.asarray(value.get('size', 6), dtype=np.float32), (n,))
+    color = np.broadcast_to(np.asarray(value.get('color', DEFAULT_COLOR), dtype=np.uint8), (n, 3))
+
+    return {
+        'n': n,
+        'domain': _limits(x) + _limits(y),
+        'pos': _encode(np.column_stack([x, y]), np.float32),
+        'size': _encode(size, np.float32),
+        'color': _encode(color, np.uint8),
+    }
+
+
+def render_scatter_gl(_fn=None):
+    """Render a dict of `x`, `y`, `size` and `color` as a WebGL scatter plot."""
+    return ScatterGlTransformer(_fn)
+
+
+async def send_scatter_delta(session, id, rows, size=None, color=None):
+    """Update the `size` and/or `color` of `rows` in a rendered scatter plot.
+
+    `size` and `color` hold one value per row in `rows`, in the same order.
+    """
+    msg = {'id': session.ns(id), 'rows': _encode(rows, np.int32)}
+    if size is not None:
+        msg['size'] = _encode(size, np.float32)
+    if color is not None:
+        msg['color'] = _encode(color, np.uint8)
+    await session.send_custom_message('scatter-gl-delta', msg)
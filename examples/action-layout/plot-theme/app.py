@@ -1,7 +1,8 @@
-from shiny import App, ui, render
+from shiny import App, ui
 import shinyswatch
 from plotnine import ggplot, aes, geom_point, geom_smooth
 from pydataset import data
+from plot_cache import cached_plot
 
 mtcars = data("mtcars")
 
@@ -12,7 +13,7 @@ app_ui = ui.page_fluid(
 )
 
 def server(input, output, session):
-    @render.plot
+    @cached_plot()
     def plot():
         res = (ggplot(mtcars, aes(x='wt', y='mpg'))
                 + geom_point()
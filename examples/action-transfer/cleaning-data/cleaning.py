@@ -0,0 +1,87 @@
+"""Memoized cleaning steps for an uploaded data frame.
+
+`CleaningPipeline` wraps one parsed upload and applies the app's three
+cleaning steps in order: snake-case names, drop empty columns, drop
+constant columns. Each step is a pure stage keyed on the flags of the steps
+before it and its own flag, and its result is kept. Flipping one checkbox
+therefore reruns only the steps after it, and flipping it back reruns
+nothing. The input frame is never modified.
+
+`run()` applies all three steps at once. `snake()`, `drop_empty()` and
+`drop_constant()` apply one step each to the `Stage` before it, so each
+step can be its own reactive calc.
+
+Whether a column is empty or constant does not depend on its name or on
+which other columns were dropped, so both checks are computed once per
+column of the input and reused by every stage.
+"""
+from collections import namedtuple
+
+import janitor
+import numpy as np
+
+# the frame after a step, the input position of each of its columns, and the
+# step flags that led to it
+Stage = namedtuple("Stage", ["df", "positions", "key"])
+
+
+class CleaningPipeline:
+    def __init__(self, raw):
+        self.raw = raw
+        self._stages = {}
+        self._empty = None
+        self._constant = None
+
+    def empty_columns(self):
+        """Whether each column of the input is entirely missing."""
+        if self._empty is None:
+            self._empty = self.raw.isna().all().to_numpy()
+        return self._empty
+
+    def constant_columns(self):
+        """Whether each column of the input has exactly one distinct value,
+        as `drop_constant_columns()` decides it."""
+        if self._constant is None:
+            self._constant = self.raw.nunique().eq(1).to_numpy()
+        return self._constant
+
+    def _stage(self, key, compute):
+        if key not in self._stages:
+            self._stages[key] = Stage(*compute(), key)
+        return self._stages[key]
+
+    def _snake(self):
+        # only the names change, so clean an empty frame and keep the data as is
+        names = self.raw.head(0).clean_names(case_type='snake').columns
+        # a shallow copy shares the column data with the input; set_axis()
+        # would copy every column
+        df = self.raw.copy(deep=False)
+        df.columns = names
+        return df
+
+    @staticmethod
+    def _drop(stage, dropped):
+        # stages carry the input position of each of their columns
+        keep = np.flatnonzero(~dropped[stage.positions])
+        return stage.df.iloc[:, keep], stage.positions[keep]
+
+    def snake(self, flag=False):
+        """First step: the input, with snake-case column names if `flag`."""
+        return self._stage((flag,), lambda: (
+            self._snake() if flag else self.raw, np.arange(self.raw.shape[1])))
+
+    def drop_empty(self, stage, flag=False):
+        """Second step: `stage` without its empty columns if `flag`."""
+        return self._stage(stage.key + (flag,), lambda: (
+            self._drop(stage, self.empty_columns()) if flag else stage[:2]))
+
+    def drop_constant(self, stage, flag=False):
+        """Third step: `stage` without its constant columns if `flag`."""
+        return self._stage(stage.key + (flag,), lambda: (
+            self._drop(stage, self.constant_columns()) if flag else stage[:2]))
+
+    def run(self, snake=False, empty=False, constant=False):
+        """The cleaned data frame for the given step flags."""
+        stage = self.snake(snake)
+        stage = self.drop_empty(stage, empty)
+        return self.drop_constant(stage, constant).df
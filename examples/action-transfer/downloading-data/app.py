@@ -1,28 +1,38 @@
 from shiny import App, ui, render, reactive, req
 import pandas as pd
-from pydataset import data
+from catalog import Catalog
+from data_export import iter_export, formats
 
-datasets = list(data()["dataset_id"])
+# datasets are read lazily in the background and kept in memory for all sessions
+catalog = Catalog()
 
 app_ui = ui.page_fluid(
-    ui.input_select("dataset", "Pick a dataset", datasets),
+    ui.input_select("dataset", "Pick a dataset", catalog.names()),
     ui.output_table("preview"),
-    ui.download_button("download_tsv", "Download .tsv"),
+    ui.row(
+        ui.column(4,
+                  ui.input_select("ext", "Download file type",
+                                  choices=formats(),
+                                  selected='tsv')),
+        ui.column(6, ui.download_button("download_data", "Download data")),
+    ),
 )
 
 def server(input, output, session):
     @reactive.calc
-    def df():
-        return data(input.dataset())
+    async def df():
+        return await catalog.aget(input.dataset())
     
     @render.table
-    def preview():
-        req(isinstance(df(), pd.DataFrame))
-        return df().head()
+    async def preview():
+        req(isinstance(await df(), pd.DataFrame))
+        return (await df()).head()
     
-    @session.download(filename=lambda: f"{input.dataset()}.tsv")
-    def download_tsv():
-        yield df().to_csv(None, sep="\t", index=False)
+    # the file is sent in batches of rows as it is written, not built in memory first
+    @session.download(filename=lambda: f"{input.dataset()}.{input.ext()}")
+    async def download_data():
+        for chunk in iter_export(await df(), input.ext()):
+            yield chunk
 
 
-app = App(app_ui, server)
\ No newline at end of file
+app = App(app_ui, server)
@@ -0,0 +1,103 @@
+"""Download a data frame as text or as a binary columnar file.
+
+`formats()` lists the file types that can be offered in a select input, the
+same way the histogram app offers png, pdf and svg. `iter_export()` writes
+the chosen type in batches of rows and yields the bytes of each batch as
+soon as it is written:
+
+- `tsv`, `tsv.gz`, `tsv.zst`: tab-separated text, see `tsv_stream.py`
+- `parquet`: Parquet, one row group per batch
+- `arrows`: Arrow IPC stream
+- `feather`: Feather (Arrow IPC file), LZ4-compressed
+
+The binary formats keep column types and are much faster to write and to
+read back than text; Parquet and Feather are compressed as well. They need
+`pyarrow`; without it only the TSV types are offered.
+"""
+import io
+
+from tsv_stream import iter_tsv, compressions
+
+BATCH_ROWS = 64 * 1024
+
+_TSV = {"tsv": None, "tsv.gz": "gzip", "tsv.zst": "zstd"}
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def formats():
+    """File types (and file extensions) that can be exported here."""
+    res = [ext for ext, compression in _TSV.items() if compression in compressions()]
+    if _has_pyarrow():
+        res += ["parquet", "arrows", "feather"]
+    return res
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last `drain()`."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _iter_arrow(df, ext, batch_rows):
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    # one schema for the whole frame, so every batch gets the same column types
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    sink = _Sink()
+    if ext == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+        write = writer.write_table
+        to_batch = pa.Table.from_pandas
+    else:
+        if ext == "arrows":
+            writer = pa.ipc.new_stream(sink, schema)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression="lz4")
+            writer = pa.ipc.new_file(sink, schema, options=options)
+        write = writer.write_batch
+        to_batch = pa.RecordBatch.from_pandas
+
+    with writer:
+        for start in range(0, len(df), batch_rows):
+            chunk = df.iloc[start:start + batch_rows]
+            write(to_batch(chunk, schema=schema, preserve_index=False))
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_export(df, ext, batch_rows=BATCH_ROWS):
+    """Yield `df` written as file type `ext`, one batch of rows at a time."""
+    if ext in _TSV:
+        return iter_tsv(df, compression=_TSV[ext])
+    if ext in ("parquet", "arrows", "feather"):
+        return _iter_arrow(df, ext, batch_rows)
+    raise ValueError(f"Unknown file type: {ext!r}")
@@ -1,7 +1,9 @@
 from shiny import App, ui
-import subprocess
-import tempfile
-import shutil
+
+from report_service import ReportService, iter_file
+
+# one pool of renderers shared by every session of the app
+reports = ReportService("report.qmd", workers=2)
 
 app_ui = ui.page_fluid(
     ui.input_slider("n", "Number of points", 1, 100, 50),
@@ -10,26 +12,23 @@ app_ui = ui.page_fluid(
 
 def server(input, output, session):
     @session.download(filename="report.html")
-    def report():
-        id = ui.notification_show(
-            "Rendering report...",
-            duration=None,
-            close_button=False
-        )
-
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            source_file = '/'.join([tmpdirname, "report.qmd"])
-            shutil.copy("report.qmd", source_file)
-            subprocess.run([
-                'quarto', 'render', source_file,
-                '-P', f"n:{input.n()}"
-            ])
-
-            output_file = '/'.join([tmpdirname, "report.html"])
-            html_file = open(output_file, 'r')
-            html_docs = html_file.read()
+    async def report():
+        path = reports.cached(n=input.n())
+        if path is None:
+            message = "Waiting for a free renderer..." if reports.busy() else "Rendering report..."
+            id = ui.notification_show(
+                message,
+                duration=None,
+                close_button=False
+            )
+            try:
+                path = await reports.report(n=input.n())
+            finally:
+                ui.notification_remove(id)
 
-        yield html_docs
+        # stream the cached file instead of reading it into one string
+        for chunk in iter_file(path):
+            yield chunk
 
 
 app = App(app_ui, server)
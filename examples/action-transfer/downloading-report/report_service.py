@@ -0,0 +1,195 @@
+"""Render Quarto reports off the event loop with a fixed pool of workers.
+
+Running `quarto render` with `subprocess.run()` inside a download handler
+blocks every session of the app until the render finishes. `ReportService`
+instead keeps a small pool of workers. Each worker has its own directory
+outside the app directory (so `--reload` is not triggered), and runs a plain
+`quarto render` there for every request, with a fresh Jupyter kernel.
+
+`daemon_seconds` optionally adds `--execute-daemon`, so Quarto keeps each
+worker's kernel alive between renders and later renders skip the kernel
+startup. It is off by default: a kept kernel also keeps whatever the
+previous render left in it, so only turn it on for a report that has been
+checked to give the same output for each parameter value whatever was
+rendered before it.
+
+Renders run as asyncio subprocesses, so the event loop keeps serving other
+sessions. Requests queue for a free worker, so at most `workers` renders run
+at once however many users ask for a report at the same moment.
+
+Rendered reports are also kept on disk in `cache_dir`, keyed by a hash of
+the source and the parameters, so asking again for a report that was
+already rendered costs no render at all. Concurrent requests for the same
+report share one render. The least recently used reports are removed once
+the cache grows past `cache_bytes`. The files are named `*.report` rather
+than `*.html`, so writing them does not trigger `--reload`.
+
+    reports = ReportService("report.qmd", workers=2)
+    ...
+    path = await reports.report(n=50)
+    for chunk in iter_file(path):
+        yield chunk
+"""
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+
+CACHE_BYTES = 100 * 1024 * 1024
+CHUNK_BYTES = 64 * 1024
+
+
+class ReportError(RuntimeError):
+    pass
+
+
+class ReportService:
+    def __init__(self, source, workers=2, daemon_seconds=None, quarto="quarto",
+                 cache_dir="report-cache", cache_bytes=CACHE_BYTES):
+        self.source = os.path.abspath(source)
+        self.workers = workers
+        self.daemon_seconds = daemon_seconds
+        self.quarto = quarto
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.cache_bytes = cache_bytes
+        self._idle = None
+        self._root = None
+        self._copied = {}
+        self._pending = {}
+
+    def _pool(self):
+        # created on first use, inside the event loop that serves the app; all
+        # worker directories live in one temporary directory, removed by
+        # `close()` or at the latest when the process exits
+        if self._idle is None:
+            self._root = tempfile.TemporaryDirectory(prefix="report-workers-")
+            self._idle = asyncio.Queue()
+            for i in range(self.workers):
+                workdir = os.path.join(self._root.name, f"worker-{i}")
+                os.mkdir(workdir)
+                self._idle.put_nowait(workdir)
+        return self._idle
+
+    def close(self):
+        """Remove the worker directories and what was rendered in them.
+
+        The rendered reports in the cache are kept.
+        """
+        if self._root is not None:
+            self._root.cleanup()
+        self._root = None
+        self._idle = None
+        self._copied = {}
+
+    def busy(self):
+        """Whether every worker is rendering, so a new request has to wait."""
+        return self._idle is not None and self._idle.empty()
+
+    def _prepare(self, workdir):
+        # copy the source only when it changed, so that with `daemon_seconds`
+        # the worker keeps rendering the same file with its kept kernel
+        stat = os.stat(self.source)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        target = os.path.join(workdir, os.path.basename(self.source))
+        if self._copied.get(workdir) != signature or not os.path.exists(target):
+            shutil.copyfile(self.source, target)
+            self._copied[workdir] = signature
+        return target
+
+    async def _run(self, workdir, params):
+        source_file = self._prepare(workdir)
+        args = [self.quarto, 'render', source_file]
+        if self.daemon_seconds:
+            args += ['--execute-daemon', str(self.daemon_seconds)]
+        for name, value in params.items():
+            args += ['-P', f"{name}:{value}"]
+        proc = await asyncio.create_subprocess_exec(
+            *args, cwd=workdir,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise ReportError(stderr.decode(errors='replace')[-2000:])
+        return os.path.splitext(source_file)[0] + ".html"
+
+    async def render(self, output_file, **params):
+        """Render the report with Quarto parameters `params` to `output_file`.
+
+        Waits for a free worker first; the render itself runs in a subprocess.
+        """
+        idle = self._pool()
+        workdir = await idle.get()
+        try:
+            html_file = await self._run(workdir, params)
+            shutil.move(html_file, output_file)
+        finally:
+            idle.put_nowait(workdir)
+        return output_file
+
+    def _key(self, params):
+        # -P passes every value as text, so the key does too
+        h = hashlib.sha256()
+        with open(self.source, "rb") as f:
+            h.update(f.read())
+        h.update(repr(sorted((k, str(v)) for k, v in params.items())).encode("utf-8"))
+        return h.hexdigest()
+
+    def cached(self, **params):
+        """Path of the cached report for `params`, or None if not rendered yet."""
+        path = os.path.join(self.cache_dir, f"{self._key(params)}.report")
+        if not os.path.exists(path):
+            return None
+        try:
+            # mark it as recently used for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    async def report(self, **params):
+        """Path of the rendered report for `params`, rendering it on a miss.
+
+        The file may be evicted later; open it right away. An open file
+        can still be read to the end after it is removed.
+        """
+        path = self.cached(**params)
+        if path is not None:
+            return path
+        key = self._key(params)
+        if key not in self._pending:
+            task = asyncio.ensure_future(self._render_cached(key, params))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+            self._pending[key] = task
+        # a session that goes away does not cancel the render other sessions wait for
+        return await asyncio.shield(self._pending[key])
+
+    async def _render_cached(self, key, params):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.report")
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        await self.render(tmp_path, **params)
+        os.replace(tmp_path, path)
+        self._evict()
+        return path
+
+    def _evict(self):
+        # drop the least recently used reports once the directory is too big
+        entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".report")]
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries[:-1]:
+            if total <= self.cache_bytes:
+                break
+            total -= entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def iter_file(path, chunk_bytes=CHUNK_BYTES):
+    """Yield the bytes of the file at `path`, `chunk_bytes` at a time."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            yield chunk
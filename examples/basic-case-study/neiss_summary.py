@@ -0,0 +1,129 @@
+"""Summaries of the NEISS injuries table, shared by every session.
+
+The functions work on the integer category codes of the cached table and a
+`product_index()` row range, so summarising a product never copies it.
+"""
+from functools import lru_cache
+import os
+
+import numpy as np
+import pandas as pd
+
+from neiss_cache import file_signature
+
+
+def make_count_top(injuries, index, vars=('diag', 'body_part', 'location'), maxsize=256):
+    """Return a memoized `count_top(prod_code, var, n=5)` for `injuries`.
+
+    Each variable in `vars` must be categorical. The first call for a product
+    counts all of `vars` in one go; the top-N table for each `(prod_code, var, n)`
+    is then kept in an LRU cache of `maxsize` entries.
+    """
+    weight = injuries['weight'].to_numpy()
+    codes = {var: injuries[var].cat.codes.to_numpy() for var in vars}
+    categories = {var: injuries[var].cat.categories.to_numpy() for var in vars}
+
+    @lru_cache(maxsize=maxsize)
+    def breakdowns(prod_code):
+        start, stop = index.get(prod_code, (0, 0))
+        w = weight[start:stop]
+        res = {}
+        for var in vars:
+            # shift codes by one so missing values (-1) land in bin 0
+            bins = codes[var][start:stop] + 1
+            size = len(categories[var]) + 1
+            res[var] = (
+                np.bincount(bins, minlength=size)[1:],
+                np.bincount(bins, weights=w, minlength=size),
+            )
+        return res
+
+    @lru_cache(maxsize=maxsize)
+    def count_top(prod_code, var, n=5):
+        counts, sums = breakdowns(prod_code)[var]
+        # rank by number of rows, as `value_counts()` does
+        top = np.argsort(-counts, kind='stable')[:n]
+        top = top[counts[top] > 0]
+
+        other = np.ones(len(sums), dtype=bool)
+        other[top + 1] = False
+        return pd.DataFrame({
+            var: list(categories[var][top]) + ["Other"],
+            'n': np.append(sums[top + 1], sums[other].sum()).astype(np.int64),
+        })
+
+    return count_top
+
+
+def _build_age_sex(injuries, index, population):
+    prod_codes = np.array(sorted(index), dtype=np.int64)
+    ages = np.unique(injuries['age'].dropna().to_numpy())
+    sexes = injuries['sex'].cat.categories.to_numpy(dtype=str)
+
+    # flat (product, age, sex) cell of every row; rows with a missing age or
+    # sex are dropped, as `groupby()` does
+    age = injuries['age'].to_numpy()
+    sex = injuries['sex'].cat.codes.to_numpy()
+    keep = ~np.isnan(age) & (sex >= 0)
+    prod = np.searchsorted(prod_codes, injuries['prod_code'].to_numpy()[keep])
+    cell = (prod * len(ages) + np.searchsorted(ages, age[keep])) * len(sexes) + sex[keep]
+    shape = (len(prod_codes), len(ages), len(sexes))
+    n = np.bincount(
+        cell, weights=injuries['weight'].to_numpy()[keep], minlength=np.prod(shape)
+    ).reshape(shape)
+
+    lookup = dict(zip(zip(population['age'], population['sex']), population['population']))
+    pop = np.array(
+        [[lookup.get((a, s), np.nan) for s in sexes] for a in ages], dtype=float
+    ).reshape(shape[1:])
+
+    return {
+        'prod_codes': prod_codes,
+        'ages': ages,
+        'sexes': sexes,
+        'n': n,
+        'population': pop,
+        'rate': n / pop * 1e4,
+    }
+
+
+def make_age_sex_summary(injuries, index, population, path="neiss/age_sex.npz",
+                         sources=("neiss/injuries.tsv.gz", "neiss/population.tsv")):
+    """Return `summary(prod_code)` backed by a (product x age x sex) cube.
+
+    The cube of weighted counts and rates per 10,000 people is saved to `path`
+    and reused on restart until any file in `sources` changes.
+    """
+    signature = np.array(
+        [[file_signature(f)['size'], file_signature(f)['mtime_ns']] for f in sources],
+        dtype=np.int64,
+    )
+    try:
+        with np.load(path) as saved:
+            cube = dict(saved)
+        if not np.array_equal(cube.pop('signature'), signature):
+            raise ValueError("stale age/sex cube")
+    except (OSError, ValueError, KeyError):
+        cube = _build_age_sex(injuries, index, population)
+        # write under a temporary name so other workers never read half a file
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, signature=signature, **cube)
+        os.replace(tmp_path, path)
+
+    empty = np.zeros(cube['n'].shape[1:])
+
+    def summary(prod_code):
+        i = np.searchsorted(cube['prod_codes'], prod_code)
+        found = i < len(cube['prod_codes']) and cube['prod_codes'][i] == prod_code
+        n = cube['n'][i] if found else empty
+        rate = cube['rate'][i] if found else empty
+        age, sex = np.nonzero(n > 0)
+        return pd.DataFrame({
+            'age': cube['ages'][age],
+            'sex': cube['sexes'][sex],
+            'n': n[age, sex],
+            'population': cube['population'][age, sex],
+            'rate': rate[age, sex],
+        })
+
+    return summary
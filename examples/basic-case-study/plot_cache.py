@@ -0,0 +1,132 @@
+"""Render cache for plot outputs, shared by every session.
+
+`@cached_plot()` is used in place of `@render.plot`. It takes the reactive
+reads the plot depends on, the same way `@reactive.event()` takes its
+triggers:
+
+    @cached_plot(summary, input.y)
+    def age_sex():
+        ...
+
+The cache key is the plot function, the values of those reads and the size
+and pixel ratio of the plot on the client. A hit skips both the plotting code
+and the PNG encoding. Rendered images are kept in memory and written to
+`plot-cache/` on disk, so other sessions and restarted workers reuse them too.
+
+Because the disk cache outlives the app, list the calc that returns the data
+being drawn (a data frame is keyed on its contents), not only the inputs it
+was computed from: when the data file changes, the inputs do not.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from shiny import render, ui
+from shiny.render.transformer import output_transformer
+
+MEMORY_ITEMS = 128
+DISK_BYTES = 200 * 1024 * 1024
+
+# the transform function behind `@render.plot`, reused on a cache miss so that
+# cached images are encoded exactly as Shiny would encode them
+_render_plot = render.plot(lambda: None)._transformer
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def _fingerprint(value):
+    if type(value).__module__.startswith("pandas"):
+        import pandas as pd
+        columns = repr(getattr(value, "columns", None)).encode("utf-8")
+        rows = pd.util.hash_pandas_object(value).to_numpy()
+        return hashlib.sha1(columns + rows.tobytes()).hexdigest()
+    if hasattr(value, "tobytes") and getattr(value, "dtype", None) != object:
+        return hashlib.sha1(value.tobytes()).hexdigest()
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+    return repr(value)
+
+
+def _key(fn, values, size):
+    code = getattr(fn, "__code__", None)
+    source = code.co_filename if code else ""
+    # editing the app file changes its mtime and so invalidates its plots
+    mtime = os.path.getmtime(source) if os.path.exists(source) else 0
+    parts = [source, mtime, fn.__qualname__, [_fingerprint(v) for v in values], size]
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _get(key, cache_dir):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json")) as f:
+            img = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _remember(key, img)
+    return img
+
+
+def _remember(key, img):
+    with _lock:
+        _memory[key] = img
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+
+
+def _save(key, img, cache_dir):
+    _remember(key, img)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = os.path.join(cache_dir, f"{key}.tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(img, f)
+    os.replace(tmp_path, os.path.join(cache_dir, f"{key}.json"))
+
+    # drop the least recently written images once the directory is too big
+    entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".json")]
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in entries)
+    for entry in entries:
+        if total <= DISK_BYTES:
+            break
+        total -= entry.stat().st_size
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+@output_transformer(default_ui=ui.output_plot)
+async def CachedPlotTransformer(_meta, _fn, *, keys=(), alt=None, cache_dir="plot-cache"):
+    inputs = _meta.session.root_scope().input
+    size = (
+        inputs[f".clientdata_output_{_meta.name}_width"](),
+        inputs[f".clientdata_output_{_meta.name}_height"](),
+        inputs[".clientdata_pixelratio"](),
+    )
+    key = _key(_fn, [k() for k in keys], size)
+
+    img = _get(key, cache_dir)
+    if img is None:
+        img = await _render_plot(_meta, _fn, alt=alt)
+        if img is not None:
+            _save(key, img, cache_dir)
+    return img
+
+
+def cached_plot(*keys, alt=None, cache_dir="plot-cache"):
+    """Like `@render.plot`, but reuse the image while `keys` and the size are unchanged.
+
+    `keys` must cover everything the plot depends on: on a hit the plot
+    function is not called, so it only reacts to `keys` and the plot size.
+    """
+    return CachedPlotTransformer(
+        None, CachedPlotTransformer.params(keys=keys, alt=alt, cache_dir=cache_dir)
+    )
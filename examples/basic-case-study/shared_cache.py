@@ -0,0 +1,106 @@
+"""Process-wide result cache for reactive calcs that depend only on inputs.
+
+Stack `shared_cache()` under `@reactive.calc` and list the reactive reads that
+determine the result, the same way `@reactive.event()` takes its triggers:
+
+    @reactive.calc
+    @shared_cache(input.code, maxsize=64, ttl=600)
+    def summary():
+        ...
+
+Every session runs the same function body, so the cache is looked up by that
+body's code object: the first session computes a result for a given set of
+key values and every other session with the same values reuses it. Cached
+results are shared, so callers must not modify them in place.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+class _Cache:
+    def __init__(self, name, maxsize, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() < entry[0]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.entries.pop(key, None)
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def info(self):
+        with self.lock:
+            return {
+                'name': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def shared_cache(*keys, maxsize=128, ttl=None):
+    """Cache a calc's result across sessions, keyed on the values of `keys`.
+
+    `keys` are reactive functions such as `input.code` or another calc; reading
+    them also makes the calc depend on them. At most `maxsize` results are
+    kept, least recently used first out, and a result older than `ttl` seconds
+    is recomputed. `ttl=None` keeps results until they are evicted.
+    """
+    def decorator(fn):
+        with _caches_lock:
+            cache = _caches.setdefault(fn.__code__, _Cache(fn.__qualname__, maxsize, ttl))
+
+        @wraps(fn)
+        def wrapper():
+            key = tuple(k() for k in keys)
+            found, value = cache.get(key)
+            if not found:
+                value = fn()
+                cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def cache_info():
+    """Hit and miss counts and current size of every shared cache."""
+    with _caches_lock:
+        return [cache.info() for cache in _caches.values()]
+
+
+def cache_clear():
+    """Drop every cached result, e.g. after the underlying data changed."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
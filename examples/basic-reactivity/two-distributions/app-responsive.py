@@ -0,0 +1,105 @@
+from shiny import App, ui, render, reactive
+import pandas as pd
+from plotnine import ggplot, geom_freqpoly, aes, coord_cartesian
+from scipy.stats import ttest_ind
+import numpy as np
+from extended_task import extended_task
+from rate_limit import debounce, throttle
+
+CHUNK = 100_000
+
+def freqpoly(x1, x2, binwidth=0.1, xlim=(-3, 3)):
+    df = pd.DataFrame({
+        "x": np.concatenate([x1, x2]),
+        "g": ["x1"] * len(x1) + ["x2"] * len(x2)
+    })
+
+    res = (ggplot(df, aes("x", colour="g"))
+           + geom_freqpoly(binwidth=binwidth, size=1)
+           + coord_cartesian(xlim=xlim))
+    
+    return res
+
+def sample(progress, mean, sd, n):
+    # drawn in chunks, so a draw for stale inputs stops at the next chunk
+    rng = np.random.default_rng()
+    chunks = []
+    for start in range(0, n, CHUNK):
+        progress.check()
+        chunks.append(rng.normal(mean, sd, size=min(CHUNK, n - start)))
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+def t_test(x1, x2):
+    test = ttest_ind(x1, x2)
+    return f"p value: {test.pvalue:.3f}\n[{test.confidence_interval().low:.2f}, {test.confidence_interval().high:.2f}]"
+
+app_ui = ui.page_fluid(
+    ui.row(
+        ui.column(4,
+            "Distribution 1",
+            ui.input_numeric("n1", label="n", value=1000, min=1),
+            ui.input_numeric("mean1", label="µ", value=0, step=0.1),
+            ui.input_numeric("sd1", label="σ", value=0.5, min=0.1, step=0.1),
+        ),
+         ui.column(4,
+            "Distribution 2",
+            ui.input_numeric("n2", label="n", value=1000, min=1),
+            ui.input_numeric("mean2", label="µ", value=0, step=0.1),
+            ui.input_numeric("sd2", label="σ", value=0.5, min=0.1, step=0.1),
+        ),
+        ui.column(4,
+            "Frequency polygon",
+            ui.input_numeric("binwidth", label="Bin Width", value=0.1, step=0.1),
+            ui.input_slider("range", label="range", value=(-3, 3), min=-5, max=5),
+        ),
+    ),
+    ui.row(
+        ui.column(9, ui.output_plot("hist")),
+        ui.column(3, ui.output_text_verbatim("ttest"))
+    ),
+)
+
+def server(input, output, session):
+    # each draw runs in the background; changing its inputs mid-draw cancels
+    # it, and only the draw for the latest inputs is shown
+    draw1 = extended_task(progress=None)(sample)
+    draw2 = extended_task(progress=None)(sample)
+
+    # typing a number or clicking a spinner starts one draw, once it settles
+    @debounce(500)
+    def params1():
+        return input.mean1(), input.sd1(), input.n1()
+
+    @debounce(500)
+    def params2():
+        return input.mean2(), input.sd2(), input.n2()
+
+    @reactive.effect
+    def _():
+        draw1.invoke(*params1())
+
+    @reactive.effect
+    def _():
+        draw2.invoke(*params2())
+
+    # dragging the range slider redraws the plot a few times a second
+    binwidth = debounce(500)(input.binwidth)
+    xlim = throttle(250)(input.range)
+
+    @reactive.calc
+    def x1():
+        return draw1.result()
+    
+    @reactive.calc
+    def x2():
+        return draw2.result()
+
+    @render.plot
+    def hist():
+        return freqpoly(x1(), x2(), binwidth=binwidth(), xlim=xlim())
+    
+    @render.text
+    def ttest():
+        return t_test(x1(), x2())
+
+app = App(app_ui, server)
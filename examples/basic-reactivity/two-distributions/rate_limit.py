@@ -0,0 +1,111 @@
+"""Limit how often a fast-changing input or calc updates what reads it.
+
+Dragging a slider, or a slider with `animate=True`, changes its input many
+times a second, and each change reruns everything that reads it. The
+wrappers here stand in for the input (or calc) and pass its changes on at a
+limited rate, like `debounce()` and `throttle()` in Shiny for R:
+
+- `debounce(ms)` passes the value on only once it has stopped changing for
+  `ms` milliseconds. Dragging a slider reruns its readers once, when the
+  drag ends.
+- `throttle(ms)` passes the value on at most once every `ms` milliseconds,
+  and always passes on the last value. Dragging a slider reruns its readers
+  a few times per second, while it is dragged.
+
+Use them inside the server function, on an input or on a function or calc:
+
+    height = throttle(250)(input.height)
+
+    @debounce(500)
+    def params():
+        return input.mean(), input.sd(), input.n()
+
+The wrapped function is called whenever its own dependencies change, so it
+should be cheap: an input, or a `@reactive.calc` that caches its value.
+"""
+import asyncio
+import contextvars
+import time
+
+from shiny import reactive
+from shiny.session import get_current_session
+
+
+def _limit(fn, ms, leading):
+    seconds = ms / 1000
+    trigger = reactive.Value(0)
+    timer = None
+    last = -float("inf")
+    primed = False
+
+    def fire():
+        nonlocal last
+        last = time.monotonic()
+        with reactive.isolate():
+            trigger.set(trigger() + 1)
+
+    async def fire_later():
+        nonlocal timer
+        timer = None
+        async with reactive.lock():
+            fire()
+            await reactive.flush()
+
+    def schedule(delay):
+        nonlocal timer
+        # an empty context, so the timer is not tied to the reactive context
+        # of the effect that set it
+        timer = asyncio.get_running_loop().call_later(
+            delay, lambda: asyncio.create_task(fire_later()), context=contextvars.Context()
+        )
+
+    @reactive.effect
+    def _():
+        nonlocal primed
+        try:
+            fn()
+        except Exception:
+            # errors, including req(), reach the readers through `result()`
+            pass
+        if not primed:
+            # the first value is passed on as it is
+            primed = True
+            return
+        if leading:
+            if timer is not None:
+                return
+            wait = last + seconds - time.monotonic()
+            if wait <= 0:
+                fire()
+            else:
+                schedule(wait)
+        else:
+            if timer is not None:
+                timer.cancel()
+            schedule(seconds)
+
+    def cancel():
+        if timer is not None:
+            timer.cancel()
+
+    session = get_current_session()
+    if session is not None:
+        session.on_ended(cancel)
+
+    @reactive.calc
+    def result():
+        trigger()
+        with reactive.isolate():
+            return fn()
+
+    return result
+
+
+def debounce(ms):
+    """Pass changes of `fn` on once it has not changed for `ms` milliseconds."""
+    return lambda fn: _limit(fn, ms, leading=False)
+
+
+def throttle(ms):
+    """Pass changes of `fn` on at most once every `ms` milliseconds."""
+    return lambda fn: _limit(fn, ms, leading=True)
@@ -0,0 +1,30 @@
+from shiny import App, ui, render
+import pandas as pd
+from sql_filter import to_sqlite, SqlFilter
+
+data = pd.DataFrame({
+    'date': pd.to_datetime(['2021-01-01', '2021-01-02', '2021-01-03']).to_pydatetime(),
+    'datetime': pd.to_datetime(['2021-01-01 00:00:00', '2021-01-02 01:00:00', '2021-01-03 23:59:59'])
+})
+
+table = SqlFilter(to_sqlite(data, "dates.sqlite", "data"), "data")
+
+app_ui = ui.page_fluid(
+    ui.layout_sidebar(
+        ui.sidebar(
+            ui.output_ui("_filter"),
+        ),
+        ui.output_table("_data"),
+    )
+)
+
+def server(input, output, session):
+    @render.ui
+    def _filter():
+        return table.make_ui()
+
+    @render.table
+    def _data():
+        return table.page({x: input[x]() for x in table.columns}, limit=12)
+
+app = App(app_ui, server)
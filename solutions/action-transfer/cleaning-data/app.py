@@ -1,7 +1,8 @@
 from shiny import Inputs, Outputs, Session, App, reactive, render, req, ui
-import pandas as pd
-import janitor
 import os
+from ingest import sniff_delimiter, read_preview, read_upload
+from cleaning import CleaningPipeline
+from data_export import iter_export, formats
 
 ui_upload = ui.layout_sidebar(
     ui.sidebar(
@@ -25,7 +26,8 @@ ui_clean = ui.layout_sidebar(
 )
 
 ui_download = ui.row(
-    ui.column(12, ui.download_button("download", "Download cleaner data", class_="btn-block")),
+    ui.column(4, ui.input_select("ext", "Download file type", choices=formats(), selected='tsv')),
+    ui.column(8, ui.download_button("download", "Download cleaner data", class_="btn-block")),
 )
 
 app_ui = ui.page_fluid(
@@ -38,49 +40,53 @@ app_ui = ui.page_fluid(
 def server(input: Inputs, output: Outputs, session: Session):
     # Upload ----------------------------------
     @reactive.calc
-    def raw():
+    def path():
         req(input.file())
-        delim = None if input.delim() == "" else input.delim()
-        res = pd.read_csv(
-            input.file()[0]["datapath"], 
-            delimiter=delim,
-            skiprows=input.skip())
-        return res
+        return input.file()[0]["datapath"]
+
+    @reactive.calc
+    def delim():
+        if input.delim() != "":
+            return input.delim()
+        return sniff_delimiter(path(), skip=input.skip())
+
+    # parsed once per file, delimiter and rows to skip
+    @reactive.calc
+    def raw():
+        return read_upload(path(), delim(), input.skip())
     
+    # reads only the rows shown, so it does not wait for the whole file
     @render.table
     def preview1():
-        return raw().head(input.rows())
+        return read_preview(path(), delim(), input.skip(), input.rows())
     
     # Clean ------------------------------------
+    # each step's result is kept, so flipping a checkbox back reruns nothing
+    @reactive.calc
+    def pipeline():
+        return CleaningPipeline(raw())
+
+    # each calc applies one step to the stage before it
     @reactive.calc
     def tidied_snake():
-        out = raw()
-        if input.snake():
-            out = out.clean_names(case_type='snake')
-        return out
+        return pipeline().snake(input.snake())
     
     @reactive.calc
     def tidied_empty():
-        out = tidied_snake()
-        if input.empty():
-            out.dropna(how='all', axis=1, inplace=True)
-        return out
+        return pipeline().drop_empty(tidied_snake(), input.empty())
     
     @reactive.calc
     def tidied_constant():
-        out = tidied_empty()
-        if input.constant():
-            out = out.drop_constant_columns()
-        return out
+        return pipeline().drop_constant(tidied_empty(), input.constant()).df
 
     @render.table
     def preview2():
         return tidied_constant().head(input.rows())
     
     # Download --------------------------------
-    @session.download(filename=lambda: f"{os.path.splitext(input.file()[0]['name'])[0]}.tsv")
+    @session.download(filename=lambda: f"{os.path.splitext(input.file()[0]['name'])[0]}.{input.ext()}")
     def download():
-        yield tidied_constant().to_csv(None, sep="\t", index=False)
+        yield from iter_export(tidied_constant(), input.ext())
 
 
 app = App(app_ui, server)
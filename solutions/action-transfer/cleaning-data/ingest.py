@@ -0,0 +1,49 @@
+"""Reading uploaded delimited files without re-parsing them.
+
+The upload is handled in three stages, so that each input only costs the
+work it needs:
+
+- `sniff_delimiter()` guesses the delimiter from a small sample at the start
+  of the file (after the skipped rows), instead of letting pandas parse the
+  whole file with the slow Python engine.
+- `read_preview()` parses only the first `rows` rows, so changing the
+  preview length, the delimiter or the rows to skip stays instant even for
+  a very large upload.
+- `read_upload()` parses the whole file. It keeps nothing itself: the app
+  calls it from a reactive calc, so the frame is parsed once per file,
+  delimiter and number of skipped rows, and is freed with the session.
+"""
+import csv
+import itertools
+
+import pandas as pd
+
+SAMPLE_BYTES = 64 * 1024
+DELIMITERS = ",\t;| "
+
+
+def sniff_delimiter(path, skip=0, sample_bytes=SAMPLE_BYTES):
+    """Guess the delimiter from up to `sample_bytes` after the first `skip` lines."""
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        lines = itertools.islice(f, skip or 0, None)
+        sample = []
+        size = 0
+        for line in lines:
+            sample.append(line)
+            size += len(line)
+            if size >= sample_bytes:
+                break
+    try:
+        return csv.Sniffer().sniff("".join(sample), delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def read_preview(path, delim, skip, rows):
+    """The first `rows` rows of the file; the rest of the file is not read."""
+    return pd.read_csv(path, delimiter=delim, skiprows=skip, nrows=rows)
+
+
+def read_upload(path, delim, skip):
+    """The whole file."""
+    return pd.read_csv(path, delimiter=delim, skiprows=skip)
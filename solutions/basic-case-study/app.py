@@ -1,28 +1,27 @@
-from shiny import App, ui, render, reactive
+from shiny import App, ui, render, reactive, req
 import pandas as pd
 from plotnine import ggplot, geom_line, aes, labs
-import numpy as np
+from neiss_cache import load_injuries, load_narratives, product_index
+from neiss_summary import make_count_top, make_age_sex_summary
+from shared_cache import shared_cache
+from plot_cache import cached_plot
 
 # data load
-injuries = pd.read_table(
-    "neiss/injuries.tsv.gz", 
-    delimiter="\t", 
-    compression="gzip",
-    parse_dates=['trmt_date']
-)
+injuries = load_injuries("neiss/injuries.tsv.gz")
+narratives = load_narratives("neiss/injuries.tsv.gz")
 products = pd.read_table("neiss/products.tsv")
 population = pd.read_table("neiss/population.tsv")
 
+# row range of each product in `injuries`
+index = product_index(injuries)
+
 prod_codes = dict(zip(products['prod_code'], products['title']))
 
-def count_top(df, var, n=5):
-    df = df.copy()
-    freq = df.value_counts(var)[:n].index.values
-    df[var] = pd.Categorical(np.where(np.isin(df[var], freq), df[var], "Other"), 
-                             categories=list(freq)+["Other"], ordered=True)
-    res = df.groupby([var], observed=False).agg(n=('weight', 'sum')).reset_index()
-    res['n'] = res['n'].astype(np.int64)
-    return res
+# top-N tables, memoized per product across sessions
+count_top = make_count_top(injuries, index)
+
+# weighted counts and rates by product, age and sex, saved in neiss/age_sex.npz
+summarise_age_sex = make_age_sex_summary(injuries, index, population)
 
 app_ui = ui.page_fluid(
     ui.row(
@@ -54,29 +53,33 @@ app_ui = ui.page_fluid(
 def server(input, output, session):
     @reactive.calc
     def selected():
-        return injuries[injuries['prod_code']==int(input.code())].copy()
+        # row numbers of the product's injuries
+        return range(*index.get(int(input.code()), (0, 0)))
     
+    # the numeric input is None while it is cleared
+    @reactive.calc
+    def n():
+        req(input.n())
+        return int(input.n())
+
     @render.table(classes='table shiny-table w-100')
     def diag():
-        return count_top(selected(), 'diag', n=input.n())
+        return count_top(int(input.code()), 'diag', n=n())
 
     @render.table(classes='table shiny-table w-100')
     def body_part():
-        return count_top(selected(), 'body_part', n=input.n())
+        return count_top(int(input.code()), 'body_part', n=n())
 
     @render.table(classes='table shiny-table w-100')
     def location():
-        return count_top(selected(), 'location', n=input.n())
+        return count_top(int(input.code()), 'location', n=n())
 
     @reactive.calc
+    @shared_cache(input.code)
     def summary():
-        res = selected().groupby(['age', 'sex']).agg(n=('weight', 'sum')).reset_index().\
-            merge(population, how='left', on=['age', 'sex'])
-        res['rate'] = res['n'] / res['population'] * 1e4
-
-        return res
+        return summarise_age_sex(int(input.code()))
     
-    @render.plot
+    @cached_plot(summary, input.y)
     def age_sex():
         if input.y()=="count":
             res = (ggplot(summary(), aes('age', 'n', colour='sex'))
@@ -102,19 +105,20 @@ def server(input, output, session):
         if current() > 0:
             current.set(current() - 1)
         else:
-            current.set(selected().shape[0] - 1)
+            current.set(len(selected()) - 1)
     
     @reactive.effect
     @reactive.event(input.forward)
     def _():
-        if current() < selected().shape[0] - 1:
+        if current() < len(selected()) - 1:
             current.set(current() + 1)
         else:
             current.set(0)
 
     @render.text
     def narrative():
-        return selected()['narrative'].values[current()]
+        req(len(selected()))
+        return narratives[selected()[current()]]
     
 
 app = App(app_ui, server)
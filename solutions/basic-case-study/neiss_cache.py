@@ -0,0 +1,180 @@
+"""Columnar on-disk cache for the NEISS injuries table.
+
+The gzipped TSV is parsed once and every column is saved as a `.npy` file.
+Later loads open those files with `mmap_mode='r'`, so all worker processes
+share the same pages from the OS page cache instead of each holding a copy.
+
+Rows are stored sorted by `prod_code`, so the injuries for one product are a
+contiguous block of rows and can be selected with a slice.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+VERSION = 2
+
+# long free-text column, stored as one utf-8 buffer plus row offsets
+STRINGS = ['narrative']
+
+
+def file_signature(path):
+    """Size and modification time of `path`, used to detect a changed file."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _is_valid(cache_dir, path):
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get('version') == VERSION and meta.get('source') == file_signature(path)
+
+
+def _save_strings(dirname, col, values):
+    encoded = [s.encode("utf-8") if isinstance(s, str) else b"" for s in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    np.save(os.path.join(dirname, f"{col}.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(dirname, f"{col}_offsets.npy"), offsets)
+
+
+class StringStore:
+    """Read-only text column kept as one utf-8 buffer plus row offsets.
+
+    `store[i]` decodes only row `i`, so sampling or paging through rows never
+    materializes the column as Python strings.
+    """
+
+    def __init__(self, dirname, col):
+        self.buffer = np.load(os.path.join(dirname, f"{col}.npy"), mmap_mode='r')
+        self.offsets = np.load(os.path.join(dirname, f"{col}_offsets.npy"), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.buffer[start:stop].tobytes().decode("utf-8")
+
+
+def _build(path, cache_dir):
+    df = pd.read_table(
+        path,
+        delimiter="\t",
+        compression="gzip",
+        parse_dates=['trmt_date']
+    )
+    df = df.sort_values('prod_code', kind='stable', ignore_index=True)
+    meta = {
+        'version': VERSION,
+        'source': file_signature(path),
+        'columns': list(df.columns),
+        'categories': {},
+    }
+
+    # build next to the final location and rename it into place, so other
+    # workers never see a half-written cache
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    for col in df.columns:
+        if col in STRINGS:
+            _save_strings(tmp_dir, col, df[col])
+            continue
+        values = df[col]
+        if values.dtype == object:
+            values = values.astype('category')
+            meta['categories'][col] = values.cat.categories.tolist()
+            values = values.cat.codes
+        np.save(os.path.join(tmp_dir, f"{col}.npy"), values.to_numpy())
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    _publish(tmp_dir, cache_dir, path)
+
+
+def _publish(tmp_dir, cache_dir, path):
+    # a published cache may be in use by another worker, so it is never
+    # deleted in place: a current one is kept, a stale one is moved aside
+    # first, and only after checking again that it is stale
+    while True:
+        try:
+            os.rename(tmp_dir, cache_dir)
+            return
+        except OSError:
+            pass
+        if _is_valid(cache_dir, path):
+            # another worker published a current cache first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        stale_dir = f"{cache_dir}.stale-{os.getpid()}"
+        try:
+            os.rename(cache_dir, stale_dir)
+        except OSError:
+            # moved aside or replaced by another worker meanwhile; look again
+            continue
+        if _is_valid(stale_dir, path):
+            # it was replaced by a current cache after the check; put it back
+            try:
+                os.rename(stale_dir, cache_dir)
+            except OSError:
+                pass
+            else:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
+        shutil.rmtree(stale_dir, ignore_errors=True)
+
+
+def _open(path, cache_dir):
+    if cache_dir is None:
+        name = os.path.basename(path).split(".")[0]
+        cache_dir = os.path.join(os.path.dirname(path), f"{name}-cache")
+
+    if not _is_valid(cache_dir, path):
+        _build(path, cache_dir)
+
+    with open(os.path.join(cache_dir, "meta.json")) as f:
+        return cache_dir, json.load(f)
+
+
+def load_injuries(path="neiss/injuries.tsv.gz", cache_dir=None):
+    """Load the injuries table, rebuilding the cache if the source changed.
+
+    The cache is rebuilt whenever the size or modification time of `path`
+    differs from the one recorded when the cache was written. Text columns in
+    `STRINGS` are left out; read them with `load_narratives()`.
+    """
+    cache_dir, meta = _open(path, cache_dir)
+
+    columns = {}
+    for col in meta['columns']:
+        if col in STRINGS:
+            continue
+        values = np.load(os.path.join(cache_dir, f"{col}.npy"), mmap_mode='r')
+        if col in meta['categories']:
+            values = pd.Categorical.from_codes(
+                values, categories=meta['categories'][col], validate=False
+            )
+        columns[col] = values
+
+    # copy=False keeps the columns backed by the memory-mapped files
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_narratives(path="neiss/injuries.tsv.gz", cache_dir=None):
+    """Return the `narrative` column as a `StringStore`, in the row order of `load_injuries()`."""
+    cache_dir, meta = _open(path, cache_dir)
+    return StringStore(cache_dir, 'narrative')
+
+
+def product_index(injuries):
+    """Map each `prod_code` to the `(start, stop)` row range it occupies."""
+    codes = injuries['prod_code'].to_numpy()
+    breaks = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.r_[0, breaks]
+    stops = np.r_[breaks, len(codes)]
+    return {int(codes[start]): (int(start), int(stop)) for start, stop in zip(starts, stops)}